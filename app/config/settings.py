@@ -1,3 +1,6 @@
+from functools import lru_cache
+from typing import Literal
+
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
 
@@ -6,7 +9,45 @@ class Settings(BaseSettings):
   MONGODB: str
   SLACK_BOT_KEY: str
 
+  MONGODB_DATABASE: str = "classroom"
+  MONGODB_MAX_POOL_SIZE: int = 100
+  MONGODB_MIN_POOL_SIZE: int = 0
+  MONGODB_MAX_IDLE_TIME_MS: int | None = None
+  MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+  MONGODB_WARMUP: bool = False
+
+  ROOM_INDEX_MAX_AGE: int = 300
+  ROLE_CACHE_SIZE: int = 1024
+  ROLE_CACHE_TTL: int = 60
+  ROLE_CACHE_CHECK_INTERVAL: float = 1.0
+  BROADCAST_QUEUE_SIZE: int = 100
+  BROADCAST_SLOW_POLICY: Literal["drop", "disconnect"] = "drop"
+  RESPONSE_CACHE_TTL: int = 30
+  JSON_DATETIME_FORMAT: Literal["rfc822", "iso8601"] = "rfc822"
+  # Upper bound, in seconds, on how long another worker's write can go unnoticed by this worker's cache
+  RESPONSE_CACHE_CHECK_INTERVAL: float = 1.0
+  PROFILE_REQUESTS: bool = False
+  PROFILE_DIR: str = "profiles"
+  PROFILE_MAX_FILES: int = 50
+  # Opt-in: archived bookings drop out of GET /classroom/, which only lists the hot collection
+  ARCHIVE_ENABLED: bool = False
+  ARCHIVE_HORIZON_DAYS: int = 180
+  ARCHIVE_BATCH_SIZE: int = 500
+  ARCHIVE_INTERVAL: int = 3600
+  STUDENT_SEARCH_MAX_AGE: int = 300
+  ROOM_REGISTRY_MAX_AGE: int = 300
+
   model_config = ConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+  return Settings()
+
+
+class LazySettings:
+  def __getattr__(self, name: str):
+    return getattr(get_settings(), name)
+
+
+settings = LazySettings()
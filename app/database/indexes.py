@@ -0,0 +1,142 @@
+import asyncio
+import sys
+from datetime import datetime
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.database.mongoDB import collection_users, collection_schedules, collection_pending, \
+  collection_rollups, collection_reservations, collection_changes
+from app.models.users import Role
+
+ARCHIVE_INDEXES = [
+  IndexModel([("rooms.room_name", ASCENDING), ("start", ASCENDING), ("end", ASCENDING)], name="room_start_end"),
+  IndexModel([("rooms.room_type", ASCENDING), ("start", ASCENDING)], name="room_type_start"),
+  IndexModel([("end", ASCENDING)], name="end"),
+]
+
+CHANGE_RETENTION_SECONDS = 30 * 24 * 3600
+PENDING_RETENTION_SECONDS = 7 * 24 * 3600
+INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+INDEX_NOT_FOUND = 27
+
+INDEXES = [
+  (collection_users, [
+    IndexModel([("api_key", ASCENDING)], name="api_key_unique", unique=True),
+    IndexModel([("email", ASCENDING)], name="email_unique", unique=True, sparse=True),
+    IndexModel([("phone_number", ASCENDING)], name="phone_number"),
+    IndexModel([("role", ASCENDING), ("_id", ASCENDING)], name="role_id"),
+  ]),
+  (collection_schedules, [
+    IndexModel([("rooms.room_name", ASCENDING), ("start", ASCENDING), ("end", ASCENDING)], name="room_start_end"),
+    IndexModel([("rooms.room_type", ASCENDING), ("start", ASCENDING)], name="room_type_start"),
+    IndexModel([("start", ASCENDING), ("_id", ASCENDING)], name="start_id"),
+    IndexModel([("end", ASCENDING)], name="end"),
+  ]),
+  (collection_pending, [
+    IndexModel([("created_at", ASCENDING)], name="created_at", expireAfterSeconds=PENDING_RETENTION_SECONDS),
+  ]),
+  (collection_rollups, [
+    IndexModel([("room_name", ASCENDING), ("day", ASCENDING)], name="room_day_unique", unique=True),
+    IndexModel([("day", ASCENDING)], name="day"),
+  ]),
+  (collection_reservations, [
+    IndexModel([("room_name", ASCENDING), ("day", ASCENDING)], name="room_day_unique", unique=True),
+  ]),
+  (collection_changes, [
+    IndexModel([("at", ASCENDING)], name="at_ttl", expireAfterSeconds=CHANGE_RETENTION_SECONDS),
+  ]),
+]
+
+HOT_QUERIES = [
+  ("is_room_available", collection_schedules, {"rooms.room_name": "Ada Lovelace"}, None),
+  ("filtered_rooms", collection_schedules, {"rooms.room_type": "Classrooms"}, None),
+  ("get_rooms_page", collection_schedules, {}, [("start", ASCENDING), ("_id", ASCENDING)]),
+  ("archive_once", collection_schedules, {"end": {"$lt": datetime(2000, 1, 1)}}, [("end", ASCENDING)]),
+  ("verify_user_role", collection_users, {"api_key": ""}, None),
+  ("check_email_exists", collection_users, {"email": ""}, None),
+  ("check_phone_number_exists", collection_users, {"phone_number": ""}, None),
+  ("get_all_students", collection_users, {"role": Role.STUDENT.value}, None),
+  ("get_students_page", collection_users, {"role": Role.STUDENT.value}, [("_id", ASCENDING)]),
+]
+
+
+async def index_drift(collection, models) -> tuple[list[str], list[str]]:
+  existing = await collection.index_information()
+  missing, outdated = [], []
+  for model in models:
+    spec = model.document
+    current = existing.get(spec["name"])
+    if current is None:
+      missing.append(spec["name"])
+      continue
+
+    same_key = list(current["key"]) == list(spec["key"].items())
+    if not same_key or any(current.get(option) != spec.get(option) for option in INDEX_OPTIONS):
+      outdated.append(spec["name"])
+  return missing, outdated
+
+
+async def drop_outdated_indexes(collection, models):
+  _, outdated = await index_drift(collection, models)
+  for name in outdated:
+    try:
+      await collection.drop_index(name)
+    except OperationFailure as e:
+      # Another worker starting at the same time dropped it first.
+      if e.code != INDEX_NOT_FOUND:
+        raise
+
+
+async def ensure_indexes():
+  for collection, models in INDEXES:
+    await drop_outdated_indexes(collection, models)
+    await collection.create_indexes(models)
+
+
+def find_stages(plan: dict):
+  stages = [plan.get("stage")]
+  for key in ("inputStage", "queryPlan"):
+    if key in plan:
+      stages.extend(find_stages(plan[key]))
+  for child in plan.get("inputStages", []):
+    stages.extend(find_stages(child))
+  return stages
+
+
+async def explain_hot_queries():
+  report = []
+  for name, collection, query, sort in HOT_QUERIES:
+    cursor = collection.find(query)
+    if sort:
+      cursor = cursor.sort(sort)
+
+    explain = await cursor.explain()
+    stages = find_stages(explain["queryPlanner"]["winningPlan"])
+    report.append((name, collection.name, "COLLSCAN" not in stages, stages))
+
+  return report
+
+
+async def main():
+  # Read-only: ensure_indexes runs at app startup, so this only reports how far the live indexes have drifted.
+  drifted = False
+  for collection, models in INDEXES:
+    missing, outdated = await index_drift(collection, models)
+    drifted = drifted or bool(missing or outdated)
+    for name in missing:
+      print(f"MISSING  {collection.name}.{name}")
+    for name in outdated:
+      print(f"OUTDATED {collection.name}.{name}")
+
+  report = await explain_hot_queries()
+
+  for name, collection_name, uses_index, stages in report:
+    print(f"{'OK  ' if uses_index else 'SCAN'} {collection_name}.{name}: {' -> '.join(filter(None, stages))}")
+
+  return not drifted and all(uses_index for _, _, uses_index, _ in report)
+
+
+if __name__ == "__main__":
+  from app.main import run_in_app
+  sys.exit(0 if asyncio.run(run_in_app(main)) else 1)
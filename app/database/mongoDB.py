@@ -1,9 +1,87 @@
+import asyncio
+
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.config.settings import settings
+from app.utils.app_state import app_instance
+from app.utils.metrics import mongo_listeners
+
+
+class MongoConnection:
+  def __init__(self, client: AsyncIOMotorClient | None = None):
+    self.preset = client
+    self.client = None
+    self.closed = False
+    self.collections = {}
+
+  def connect(self, client: AsyncIOMotorClient | None = None) -> AsyncIOMotorClient:
+    if self.client is None:
+      self.client = client or self.preset or AsyncIOMotorClient(
+        settings.MONGODB,
+        maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+        serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        event_listeners=mongo_listeners,
+      )
+      self.collections = {}
+      self.closed = False
+    return self.client
+
+  def close(self):
+    if self.client is not None:
+      self.client.close()
+      self.client = None
+    self.collections = {}
+    self.closed = True
+
+  def database(self):
+    if self.closed:
+      raise RuntimeError("The MongoDB client has been closed")
+    return self.connect()[settings.MONGODB_DATABASE]
+
+  def collection(self, name: str):
+    collection = self.collections.get(name)
+    if collection is None:
+      collection = self.collections[name] = self.database()[name]
+    return collection
+
+
+def current_connection() -> MongoConnection:
+  return app_instance("mongo", MongoConnection)
+
+
+def connect(client: AsyncIOMotorClient | None = None) -> AsyncIOMotorClient:
+  return current_connection().connect(client)
+
+
+async def warm_up():
+  database = get_database()
+  await asyncio.gather(*(database.command("ping") for _ in range(max(1, settings.MONGODB_MIN_POOL_SIZE))))
+
+
+def close():
+  current_connection().close()
+
+
+def get_database():
+  return current_connection().database()
+
+
+class LazyCollection:
+  def __init__(self, name: str):
+    self.name = name
+
+  def __getattr__(self, attr: str):
+    return getattr(current_connection().collection(self.name), attr)
 
-client = AsyncIOMotorClient(settings.MONGODB)
 
-db = client["classroom"]
-collection_users = db["users"]
-collection_schedules = db["schedules"]
+collection_users = LazyCollection("users")
+collection_schedules = LazyCollection("schedules")
+collection_pending = LazyCollection("pending_bookings")
+collection_rollups = LazyCollection("room_usage_daily")
+collection_reservations = LazyCollection("room_reservations")
+collection_archive_state = LazyCollection("archive_state")
+collection_rooms = LazyCollection("rooms")
+collection_changes = LazyCollection("schedule_changes")
+collection_counters = LazyCollection("counters")
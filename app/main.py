@@ -1,15 +1,78 @@
 from quart import Quart
 from quart_schema import QuartSchema
 
+from app.config.settings import settings, get_settings
+from app.database.indexes import ensure_indexes
+from app.database.mongoDB import MongoConnection, connect, warm_up, close
 from app.routers.admin import router as admin_router
 from app.routers.student import router as student_router
+from app.utils.app_state import init_app_state
+from app.utils.archive import booking_archiver
+from app.utils.json_provider import OrjsonProvider
+from app.utils.metrics import init_metrics
+from app.utils.profiling import init_profiling
+from app.utils.reservations import ensure_reservations
+from app.utils.room_index import room_index
+from app.utils.room_registry import room_registry
+from app.utils.send_to_admin import slack_notifier
+from app.utils.student_search import student_search
 
-app = Quart(__name__)
 
-QuartSchema(app)
+def create_app(mongo_client=None) -> Quart:
+  app = Quart(__name__)
+  init_app_state(app, mongo=MongoConnection(mongo_client))
+
+  QuartSchema(app)
+  app.json = OrjsonProvider(app)
+  init_metrics(app)
+  init_profiling(app)
+
+  app.register_blueprint(admin_router)
+  app.register_blueprint(student_router)
+
+  @app.before_serving
+  async def open_database():
+    # Loads and validates every setting before the first request instead of on first use.
+    get_settings()
+    connect()
+    if settings.MONGODB_WARMUP:
+      await warm_up()
+
+  @app.before_serving
+  async def bootstrap_database():
+    await ensure_indexes()
+    await ensure_reservations()
+    await room_registry.seed()
+    await room_registry.load()
+    await room_index.load()
+    await student_search.load()
+
+  @app.before_serving
+  async def start_notifiers():
+    await slack_notifier.start()
+    if settings.ARCHIVE_ENABLED:
+      await booking_archiver.start()
+
+  @app.after_serving
+  async def stop_notifiers():
+    await slack_notifier.stop()
+    await booking_archiver.stop()
+
+  @app.after_serving
+  async def close_database():
+    close()
+
+  return app
+
+
+async def run_in_app(job, *args):
+  app = create_app()
+  async with app.app_context():
+    try:
+      return await job(*args)
+    finally:
+      close()
 
-app.register_blueprint(admin_router)
-app.register_blueprint(student_router)
 
 if __name__ == "__main__":
-  app.run(debug=True)
+  create_app().run(debug=True)
@@ -0,0 +1,104 @@
+from datetime import datetime
+from enum import Enum
+
+from app.models.schedule import RoomType, ActivityType
+from app.models.users import Role
+
+SCHEDULE_STATUSES = frozenset(("pending", "confirmed", "rejected"))
+
+
+def coerce_enum(enum_cls: type[Enum], value):
+  if isinstance(value, enum_cls):
+    return value
+  try:
+    return enum_cls(value)
+  except ValueError:
+    raise ValueError(f"Invalid {enum_cls.__name__}: {value}") from None
+
+
+def coerce_datetime(value, field: str) -> datetime:
+  if isinstance(value, datetime):
+    return value
+  if isinstance(value, str):
+    try:
+      return datetime.fromisoformat(value)
+    except ValueError:
+      pass
+  raise ValueError(f"Invalid datetime for {field}: {value}")
+
+
+def coerce_str(value, field: str, max_length: int | None = None) -> str:
+  if not isinstance(value, str) or not value:
+    raise ValueError(f"{field} is required")
+  if max_length and len(value) > max_length:
+    raise ValueError(f"{field} must be at most {max_length} characters")
+  return value
+
+
+class RoomRecord:
+  __slots__ = ("name", "room_type", "capacity")
+
+  def __init__(self, name, room_type, capacity: int):
+    self.name = coerce_str(name, "room_name")
+    self.room_type = coerce_enum(RoomType, room_type)
+    self.capacity = int(capacity)
+
+  def to_dict(self):
+    return {
+      "room_type": self.room_type.value,
+      "room_name": self.name,
+      "capacity": self.capacity,
+    }
+
+
+class ScheduleRecord:
+  __slots__ = ("rooms", "start", "end", "group_name", "activity", "requested_capacity", "status")
+
+  def __init__(self, rooms: RoomRecord, start, end, group_name: str, activity,
+               requested_capacity: int | None = None, status: str = "pending"):
+    if status not in SCHEDULE_STATUSES:
+      raise ValueError(f"Invalid status: {status}")
+
+    self.rooms = rooms
+    self.start = coerce_datetime(start, "start")
+    self.end = coerce_datetime(end, "end")
+    self.group_name = coerce_str(group_name, "group_name")
+    self.activity = coerce_enum(ActivityType, activity)
+    self.requested_capacity = requested_capacity
+    self.status = status
+
+  def to_dict(self):
+    return {
+      "rooms": self.rooms.to_dict(),
+      "start": self.start,
+      "end": self.end,
+      "group_name": self.group_name,
+      "activity": self.activity.value,
+      "requested_capacity": self.requested_capacity,
+      "status": self.status
+    }
+
+
+class UserRecord:
+  __slots__ = ("name", "surname", "email", "phone_number", "role", "group_name", "api_key")
+
+  def __init__(self, name: str, surname: str, email: str, phone_number: str, group_name: str, api_key: str,
+               role=Role.STUDENT):
+    self.name = coerce_str(name, "name", 50)
+    self.surname = coerce_str(surname, "surname", 100)
+    self.email = coerce_str(email, "email")
+    self.phone_number = coerce_str(phone_number, "phone_number", 20)
+    self.role = coerce_enum(Role, role)
+    self.group_name = coerce_str(group_name, "group_name", 100)
+    self.api_key = coerce_str(api_key, "api_key")
+
+  def to_dict(self):
+    return {
+      "name": self.name,
+      "surname": self.surname,
+      "email": self.email,
+      "phone_number": self.phone_number,
+      "role": self.role.value,
+      "group_name": self.group_name,
+      "api_key": self.api_key
+    }
@@ -18,46 +18,11 @@ class RoomType(Enum):
   OTHERS = "Others"
 
 
-class RoomsName(Enum):
-  ADA_LOVELACE = "Ada Lovelace"
-  ALAN_TURING = "Alan Turing"
-  CLAUDE_SHANNON = "Claude Shannon"
-  DONALD_KNUTH = "Donald Knuth"
-  LIBRARY = "Library"
-  WILLIAM_SHOCKLEY = "William Shockley"
-
-  DARTH_VADER = "Darth Vader"
-  SIRIUS = "Sirius"
-  PROXIMA = "Proxima"
-
-  RECORDING_ROOM = "Recording Room"
-  CALL_ROOM_N2 = "Call Room N2"
-
-
-class RoomCapacity(Enum):
-  ADA_LOVELACE = 70
-  ALAN_TURING = 24
-  CLAUDE_SHANNON = 32
-  DONALD_KNUTH = 24
-  WILLIAM_SHOCKLEY = 20
-  LIBRARY = 30
-
-  DARTH_VADER = 9
-  SIRIUS = 6
-  PROXIMA = 3
-
-  RECORDING_ROOM = 2
-  CALL_ROOM_N2 = 2
-
-
 class Room(EmbeddedDocument):
-  name = EnumField(RoomsName, required=True)
+  name = StringField(required=True)
   room_type = EnumField(RoomType, required=True)
   capacity = IntField(required=True)
 
-  def set_capacity(self):
-    self.capacity = RoomCapacity[self.name].value
-
 
 class Schedule(Document):
   rooms = EmbeddedDocumentField(Room, required=True)
@@ -79,6 +44,7 @@ class Schedule(Document):
       "end": self.end,
       "group_name": self.group_name,
       "activity": self.activity.value if isinstance(self.activity, Enum) else self.activity,
+      "requested_capacity": self.requested_capacity,
       "status": self.status
     }
 
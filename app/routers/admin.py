@@ -1,14 +1,24 @@
+import csv
+import io
 import json
 
-from quart import jsonify, Blueprint, request, websocket
+from bson import ObjectId
+from quart import jsonify, Blueprint, request, websocket, current_app, Response
 
 from app.database.mongoDB import collection_schedules
-from app.models.schedule import Schedule
-from app.schemas.admin import BookRoom, CancelBooking
+from app.models.codec import RoomRecord, ScheduleRecord
+from app.schemas.admin import BookRoom, CancelBooking, BookRecurring, RoomEdit
 from app.services.admin_service import AdminService
+from app.utils.change_log import record_changes
 from app.utils.check_and_validation import check_valid_name, check_valid_surname, check_valid_email, \
   check_valid_phone_number, check_valid_group_name
+from app.utils.reservations import reserve, release
+from app.utils.response_cache import response_cache
+from app.utils.rollups import record_bookings
+from app.utils.room_index import room_index
 from app.utils.send_to_admin import active_connections_st
+from app.utils.storage_room import storage
+from app.utils.time_managment import parse_date_window
 
 router = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -21,6 +31,17 @@ async def get_all_students():
     if not api_key:
       return jsonify({"error": "API key is required"}), 400
 
+    if request.args.get("format") == "ndjson":
+      stream = await AdminService.stream_students(api_key)
+      if isinstance(stream, tuple):
+        return jsonify(stream[0]), stream[1]
+      return Response(stream, mimetype="application/x-ndjson")
+
+    if "limit" in request.args or "cursor" in request.args:
+      page, status_code = await AdminService.get_students_page(api_key, None, request.args.get("limit", type=int),
+                                                               request.args.get("cursor"))
+      return jsonify(page), status_code
+
     all_students = await AdminService.get_all_students(api_key)
 
     if isinstance(all_students, tuple):
@@ -32,6 +53,22 @@ async def get_all_students():
     return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
 
 
+@router.route("/students/search", methods=["GET"])
+async def search_students():
+  try:
+    api_key = request.headers.get("X-API-Key")
+
+    if not api_key:
+      return jsonify({"error": "API key is required"}), 400
+
+    results, status_code = await AdminService.search_students(api_key, request.args.get("q"),
+                                                              request.args.get("limit", type=int))
+    return jsonify(results), status_code
+
+  except Exception as e:
+    return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
+
+
 @router.route("/get_student", methods=["POST"])
 async def get_student():
   try:
@@ -44,6 +81,11 @@ async def get_student():
     if not api_key:
       return jsonify({"error": "API key is required"}), 400
 
+    if "limit" in request.args or "cursor" in request.args:
+      page, status_code = await AdminService.get_students_page(api_key, data, request.args.get("limit", type=int),
+                                                               request.args.get("cursor"))
+      return jsonify(page), status_code
+
     student_response, status_code = await AdminService.get_student(api_key, data)
 
     return jsonify(student_response), status_code
@@ -98,6 +140,34 @@ async def create_student_route():
     return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
 
 
+@router.route("/students/bulk", methods=["POST"])
+async def bulk_create_students():
+  try:
+    admin_api_key = request.headers.get("X-API-Key")
+
+    if not admin_api_key:
+      return jsonify({"error": "API key is missing"}), 400
+
+    body = await request.get_data(as_text=True)
+    if not body.strip():
+      return jsonify({"error": "No data provided"}), 400
+
+    if request.mimetype == "text/csv":
+      rows = list(csv.DictReader(io.StringIO(body)))
+    else:
+      try:
+        rows = [current_app.json.loads(line) for line in body.splitlines() if line.strip()]
+      except json.JSONDecodeError:
+        return jsonify({"error": "Invalid NDJSON format"}), 400
+
+    response, status_code = await AdminService.bulk_create_students(rows, admin_api_key)
+
+    return jsonify(response), status_code
+
+  except Exception as e:
+    return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
+
+
 @router.route("/delete_student", methods=["DELETE"])
 async def delete_student():
   try:
@@ -141,6 +211,27 @@ async def book_room():
     return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
 
 
+@router.route("/book_recurring", methods=["POST"])
+async def book_recurring():
+  try:
+    data = await request.json
+    if not data:
+      return jsonify({"error": "No data provided"}), 400
+
+    api_key = request.headers.get("X-API-Key")
+
+    if not api_key:
+      return jsonify({"error": "API key is required"}), 400
+
+    book_recurring_data = BookRecurring(**data)
+    response, status_code = await AdminService.book_recurring(book_recurring_data, api_key)
+
+    return jsonify(response), status_code
+
+  except Exception as e:
+    return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
+
+
 @router.route("/cancel_room", methods=["POST"])
 async def cancel_room():
   try:
@@ -162,22 +253,136 @@ async def cancel_room():
     return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
 
 
+@router.route("/analytics", methods=["GET"])
+async def get_room_analytics():
+  try:
+    api_key = request.headers.get("X-API-Key")
+
+    if not api_key:
+      return jsonify({"error": "API key is required"}), 400
+
+    date_window = parse_date_window(request.args.get("from"), request.args.get("to"))
+    if not date_window:
+      return jsonify({"error": "Incorrect date window"}), 400
+
+    analytics, status_code = await AdminService.get_room_analytics(api_key, *date_window,
+                                                                   request.args.get("room_name"))
+
+    return jsonify(analytics), status_code
+
+  except Exception as e:
+    return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
+
+
+@router.route("/rooms", methods=["GET"])
+async def list_rooms():
+  try:
+    api_key = request.headers.get("X-API-Key")
+
+    if not api_key:
+      return jsonify({"error": "API key is required"}), 400
+
+    rooms, status_code = await AdminService.list_rooms(api_key)
+    return jsonify(rooms), status_code
+
+  except Exception as e:
+    return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
+
+
+@router.route("/rooms", methods=["PUT"])
+async def save_room():
+  try:
+    data = await request.json
+    if not data:
+      return jsonify({"error": "No data provided"}), 400
+
+    api_key = request.headers.get("X-API-Key")
+
+    if not api_key:
+      return jsonify({"error": "API key is required"}), 400
+
+    room, status_code = await AdminService.save_room(RoomEdit(**data), api_key)
+    return jsonify(room), status_code
+
+  except Exception as e:
+    return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
+
+
+@router.route("/rooms", methods=["DELETE"])
+async def delete_room():
+  try:
+    data = await request.json
+    if not data or not data.get("room_name"):
+      return jsonify({"error": "room_name is required"}), 400
+
+    api_key = request.headers.get("X-API-Key")
+
+    if not api_key:
+      return jsonify({"error": "API key is required"}), 400
+
+    response, status_code = await AdminService.delete_room(data["room_name"], api_key)
+    return jsonify(response), status_code
+
+  except Exception as e:
+    return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
+
+
+async def confirm_pending(booking_schedule: dict):
+  schedule_data = ScheduleRecord(
+    status="confirmed",
+    rooms=RoomRecord(
+      room_type=booking_schedule['rooms']['room_type'],
+      name=booking_schedule['rooms']['room_name'],
+      capacity=booking_schedule['rooms']['capacity']
+    ),
+    start=booking_schedule['start'],
+    end=booking_schedule['end'],
+    group_name=booking_schedule['group_name'],
+    activity=booking_schedule['activity'],
+    requested_capacity=booking_schedule.get('requested_capacity'),
+  )
+
+  schedule_data_dict = {"_id": ObjectId(), **schedule_data.to_dict()}
+  room_value = schedule_data_dict["rooms"]["room_name"]
+  if not await reserve(room_value, schedule_data_dict["start"], schedule_data_dict["end"], schedule_data_dict["_id"]):
+    return None
+
+  try:
+    result = await collection_schedules.insert_one(schedule_data_dict)
+  except Exception:
+    await release(room_value, schedule_data_dict["start"], schedule_data_dict["_id"])
+    raise
+  room_index.add(schedule_data_dict["rooms"]["room_name"], schedule_data_dict["start"],
+                 schedule_data_dict["end"], result.inserted_id)
+  await record_bookings([schedule_data_dict])
+  await record_changes("confirmed", [schedule_data_dict])
+  await response_cache.bump()
+  return result.inserted_id
+
+
 @router.websocket("/ws")
 async def admin_ws_connection():
   conn = websocket._get_current_object()
   active_connections_st.add(conn)
-  from app.utils.storage_room import storage
 
   try:
     while True:
       message = await websocket.receive()
       try:
-        message_dict = json.loads(message)
+        message_dict = current_app.json.loads(message)
         status = message_dict.get("status")
+        request_id = message_dict.get("request_id")
 
-        try:
-          booking_room = storage[0]
-        except IndexError:
+        if not request_id:
+          await websocket.send_json({"error": "request_id is required"})
+          continue
+
+        if status not in ("confirmed", "rejected"):
+          await websocket.send_json({"error": "Invalid status value"})
+          continue
+
+        booking_room = await storage.pop(str(request_id))
+        if not booking_room:
           await websocket.send_json({"error": "No booking request found"})
           continue
 
@@ -186,38 +391,32 @@ async def admin_ws_connection():
           continue
 
         if status == "confirmed":
-          schedule_data = Schedule(
-            status=status,
-            rooms={
-              "room_type": booking_room['schedule']['rooms']['room_type'],
-              "name": booking_room['schedule']['rooms']['room_name'],
-              "capacity": booking_room['schedule']['rooms']['capacity']
-            },
-            start=booking_room['schedule']['start'],
-            end=booking_room['schedule']['end'],
-            group_name=booking_room['schedule']['group_name'],
-            activity=booking_room['schedule']['activity'],
-          )
-
-          schedule_data_dict = schedule_data.to_dict()
-          result = await collection_schedules.insert_one(schedule_data_dict)
-          schedule_data.id = str(result.inserted_id)
-
-          storage.clear()
+          try:
+            schedule_id = await confirm_pending(booking_room["schedule"])
+          except Exception:
+            # Leave the request pending so the admin can answer it again.
+            await storage.restore(booking_room)
+            raise
+
+          if schedule_id is None:
+            room_value = booking_room["schedule"]["rooms"]["room_name"]
+            await websocket.send_json({"error": f"The room {room_value} is occupied during the specified time period.",
+                                       "request_id": request_id})
+            continue
 
           await websocket.send_json({
             "info": "Booking confirmed",
-            "schedule_id": schedule_data.id
+            "request_id": request_id,
+            "schedule_id": str(schedule_id)
           })
 
-        elif status == "rejected":
-          await websocket.send_json({"info": "Booking rejected"})
-
         else:
-          await websocket.send_json({"error": "Invalid status value"})
+          await websocket.send_json({"info": "Booking rejected", "request_id": request_id})
 
       except json.JSONDecodeError:
         await websocket.send_json({"error": "Invalid JSON format"})
+      except ValueError as e:
+        await websocket.send_json({"error": str(e)})
 
   finally:
     active_connections_st.remove(conn)
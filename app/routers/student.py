@@ -1,31 +1,82 @@
-import json
-
-from quart import jsonify, Blueprint, request, websocket
+from quart import jsonify, Blueprint, request, websocket, Response, current_app
 
 from app.schemas.students import BookingNotification
 from app.services.student_service import StudentService
+from app.utils.response_cache import cached_response
 from app.utils.send_to_admin import broadcast_to_admins, send_slack_message, active_connections_st
+from app.utils.storage_room import storage
+from app.utils.time_managment import parse_date_window, parse_time_of_day
 
 router = Blueprint("classroom", __name__, url_prefix="/classroom")
 
 
 @router.route("/", methods=["GET"])
+@cached_response
 async def get_all_rooms():
+  if request.args.get("format") == "ndjson":
+    return Response(StudentService.stream_rooms(), mimetype="application/x-ndjson")
+
+  if "limit" in request.args or "cursor" in request.args:
+    page, status_code = await StudentService.get_rooms_page(request.args.get("limit", type=int),
+                                                            request.args.get("cursor"))
+    return jsonify(page), status_code
+
   all_rooms = await StudentService.get_all_rooms()
   return jsonify(all_rooms)
 
 
 @router.route("/room", methods=["GET"])
+@cached_response
 async def get_room():
   room_name = request.args.get("room_name")
   room_type = request.args.get("room_type")
 
+  date_window = parse_date_window(request.args.get("from"), request.args.get("to"))
+  if not date_window:
+    return jsonify({"error": "Incorrect date window"}), 400
+
   try:
-    filtered_rooms = await StudentService.filtered_rooms(room_name, room_type)
+    filtered_rooms = await StudentService.filtered_rooms(room_name, room_type, *date_window)
     return filtered_rooms
 
   except Exception as e:
-    return jsonify({"error": str(e)})
+    return jsonify({"error": str(e)}), 500
+
+
+@router.route("/changes", methods=["GET"])
+async def get_changes():
+  try:
+    changes, status_code = await StudentService.get_changes(request.args.get("since"),
+                                                            request.args.get("limit", type=int))
+    return jsonify(changes), status_code
+
+  except Exception as e:
+    return jsonify({"error": str(e)}), 500
+
+
+@router.route("/free", methods=["GET"])
+async def get_free_rooms():
+  date_window = parse_date_window(request.args.get("from"), request.args.get("to"))
+  if not date_window or not all(date_window):
+    return jsonify({"error": "Both from and to dates are required"}), 400
+
+  day_start = parse_time_of_day(request.args.get("start_time", "00:00"))
+  day_end = parse_time_of_day(request.args.get("end_time", "24:00"))
+  if day_start is None or day_end is None or day_start >= day_end:
+    return jsonify({"error": "Incorrect daily time window"}), 400
+
+  duration = request.args.get("duration", default=30, type=int)
+  capacity = request.args.get("capacity", default=1, type=int)
+  if duration < 1 or capacity < 1:
+    return jsonify({"error": "duration and capacity must be at least 1"}), 400
+
+  try:
+    free_rooms, status_code = await StudentService.find_free_slots(*date_window, duration * 60, capacity,
+                                                                   day_start, day_end)
+    return jsonify(free_rooms), status_code
+
+  except Exception as e:
+    return jsonify({"error": str(e)}), 500
 
 
 @router.websocket("/ws")
@@ -36,26 +87,25 @@ async def student_ws_connection():
 
   conn = websocket._get_current_object()
   active_connections_st.add(conn)
-  from app.utils.storage_room import storage
 
   try:
     while True:
       message = await websocket.receive()
       try:
-        message_dict = json.loads(message)
+        message_dict = current_app.json.loads(message)
         booking_notification = BookingNotification(**message_dict)
 
         response, status_code = await StudentService.send_book_room_notification(booking_notification, api_key)
-        storage.append(response)
         if status_code != 200:
           await websocket.send_json({"error": response})
         else:
-          await websocket.send_json({"success": response})
-          await broadcast_to_admins(f"Notification from Student: {message}")
+          request_id = await storage.add(response)
+          await websocket.send_json({"success": response, "request_id": request_id})
+          await broadcast_to_admins(f"Notification from Student (request {request_id}): {message}")
           slack_text = (f"📢 New Booking Notification!\n**Student:** "
                         f"{message_dict.get('student_name')}\n**Room:**"
                         f" {message_dict.get('room_number')}")
-          await send_slack_message(slack_text)
+          send_slack_message(slack_text)
       except:
         await websocket.send_json({"error": "Invalid arguments"})
         continue
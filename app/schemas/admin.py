@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 
 from bson import ObjectId
 from pydantic import BaseModel, Field
@@ -26,6 +27,26 @@ class BookRoom(BaseModel):
   created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class BookingSlot(BaseModel):
+  date: str
+  start_time: str
+  end_time: str
+
+
+class BookRecurring(BaseModel):
+  room_name: str
+  activity: str
+  group_name: str
+  start_time: str | None = None
+  end_time: str | None = None
+  date: str | None = None
+  recurrence: Literal["weekly", "biweekly"] | None = None
+  until: str | None = None
+  exceptions: list[str] = []
+  slots: list[BookingSlot] = []
+  on_conflict: Literal["reject", "partial"] = "reject"
+
+
 class DeleteStudent(BaseModel):
   api_key: str
   email: str
@@ -37,3 +58,11 @@ class CancelBooking(BaseModel):
   start: str
   end: str
   date: str
+
+
+class RoomEdit(BaseModel):
+  name: str
+  room_type: Literal["Classrooms", "Meeting Rooms", "Others"]
+  capacity: int = Field(gt=0)
+  id: str | None = None
+  aliases: list[str] = []
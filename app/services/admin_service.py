@@ -1,38 +1,128 @@
+from datetime import datetime
+
+import orjson
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
 from quart import jsonify
 
-from app.database.mongoDB import collection_users, collection_schedules
-from app.models.schedule import Room, RoomsName, Schedule, RoomCapacity
-from app.models.users import User, Role
+from app.database.mongoDB import collection_users, collection_schedules, collection_rollups
+from app.models.codec import RoomRecord, ScheduleRecord, UserRecord
+from app.models.users import Role
 from app.schemas.admin import Admin, DeleteStudent, CancelBooking
-from app.schemas.admin import BookRoom
+from app.schemas.admin import BookRoom, BookRecurring, RoomEdit
 from app.schemas.students import Student
-from app.utils.check_and_validation import check_email_exists, check_phone_number_exists
-from app.utils.check_role import verify_user_role
-from app.utils.fix_enum import determine_room_type
+from app.utils.check_and_validation import check_email_exists, check_phone_number_exists, student_row_errors, \
+  find_existing_contacts, STUDENT_ROW_FIELDS
+from app.utils.change_log import record_changes
+from app.utils.check_role import verify_user_role, role_cache
 from app.utils.generate_key import generate_api_key
-from app.utils.time_managment import is_time_valid, combine_date_and_time, is_room_available
+from app.utils.json_provider import dumps_bytes
+from app.utils.pagination import encode_cursor, decode_cursor, page_size
+from app.utils.reservations import reserve, reserve_many, release
+from app.utils.response_cache import response_cache
+from app.utils.rollups import record_bookings
+from app.utils.room_index import room_index, to_naive_utc
+from app.utils.room_registry import room_registry
+from app.utils.student_search import student_search
+from app.utils.time_managment import is_time_valid, combine_date_and_time, is_room_available, expand_recurrence
+
+BULK_BATCH_SIZE = 1000
+STUDENT_FIELDS = ("name", "surname", "email", "phone_number", "group_name", "created_at")
+STUDENT_PROJECTION = dict.fromkeys(STUDENT_FIELDS, 1)
 
 
 class AdminService:
+  @staticmethod
+  def serialize_student(student: dict, with_id: bool = False):
+    serialized = {"id": str(student["_id"])} if with_id else {}
+    for field in STUDENT_FIELDS:
+      if field in student:
+        serialized[field] = student[field]
+    return serialized
+
+  @staticmethod
+  def student_query(filters: dict | None):
+    query = {"role": Role.STUDENT.value}
+    if filters is None:
+      return query
+
+    allowed_fields = {"name", "email", "phone_number"}
+    matches = {key: value for key, value in filters.items() if key in allowed_fields}
+    if not matches:
+      return None
+
+    query.update(matches)
+    return query
+
   @staticmethod
   async def get_all_students(api_key: str):
     admin = await verify_user_role(api_key)
     if not admin or admin != Role.ADMIN:
       return jsonify({"error": "Not authorized"}), 401
 
-    students_cursor = collection_users.find({"role": Role.STUDENT.value})
+    students_cursor = collection_users.find(AdminService.student_query(None), STUDENT_PROJECTION)
     students_list = await students_cursor.to_list(length=None)
 
     if not students_list:
       return jsonify({"error": "Student not found"}), 404
 
-    all_students = [
-      Student.model_validate({**student, "_id": str(student["_id"])})
-      .model_dump(by_alias=True, exclude_unset=True, exclude={"api_key"})
-      for student in students_list
-    ]
+    return [AdminService.serialize_student(student) for student in students_list]
+
+  @staticmethod
+  async def get_students_page(api_key: str, filters: dict | None, limit: int | None, cursor: str | None):
+    admin = await verify_user_role(api_key)
+    if not admin or admin != Role.ADMIN:
+      return {"error": "Not authorized"}, 401
+
+    query = AdminService.student_query(filters)
+    if query is None:
+      return {"error": "At least one search parameter is required"}, 400
+    if cursor:
+      parts = decode_cursor(cursor)
+      try:
+        query["_id"] = {"$gt": ObjectId(parts[0])}
+      except Exception:
+        return {"error": "Invalid cursor"}, 400
+
+    size = page_size(limit)
+    students = await (collection_users.find(query, STUDENT_PROJECTION)
+                      .sort("_id", 1).limit(size).to_list(length=size))
+
+    next_cursor = encode_cursor(str(students[-1]["_id"])) if len(students) == size else None
+
+    return {"students": [AdminService.serialize_student(student, with_id=True) for student in students],
+            "next_cursor": next_cursor}, 200
+
+  @staticmethod
+  async def stream_students(api_key: str, filters: dict | None = None):
+    admin = await verify_user_role(api_key)
+    if not admin or admin != Role.ADMIN:
+      return {"error": "Not authorized"}, 401
+
+    query = AdminService.student_query(filters)
+    if query is None:
+      return {"error": "At least one search parameter is required"}, 400
+
+    cursor = collection_users.find(query, STUDENT_PROJECTION).sort("_id", 1)
+
+    async def rows():
+      async for student in cursor:
+        yield dumps_bytes(AdminService.serialize_student(student, with_id=True), orjson.OPT_APPEND_NEWLINE)
+
+    return rows()
+
+  @staticmethod
+  async def search_students(api_key: str, query: str, limit: int | None):
+    admin = await verify_user_role(api_key)
+    if not admin or admin != Role.ADMIN:
+      return {"error": "Not authorized"}, 401
+
+    if not query or not query.strip():
+      return {"error": "Search query is required"}, 400
 
-    return all_students
+    student_search.refresh_in_background()
+    return {"students": student_search.search(query, page_size(limit))}, 200
 
   @staticmethod
   async def get_student(api_key: str, filters: dict):
@@ -40,23 +130,18 @@ class AdminService:
     if not admin or admin != Role.ADMIN:
       return {"error": "Not authorized"}, 401
 
-    allowed_fields = {"name", "email", "phone_number"}
-    query = {key: value for key, value in filters.items() if key in allowed_fields}
+    query = AdminService.student_query(filters)
 
-    if not query:
+    if query is None:
       return {"error": "At least one search parameter is required"}, 400
 
-    students_cursor = collection_users.find(query)
+    students_cursor = collection_users.find(query, STUDENT_PROJECTION)
     students_list = await students_cursor.to_list(length=None)
 
     if not students_list:
       return {"error": "No student found"}, 404
 
-    students = [
-      Student.model_validate({**student, "_id": str(student["_id"])}).
-      model_dump(by_alias=True, exclude_unset=True, exclude={"api_key"})
-      for student in students_list
-    ]
+    students = [AdminService.serialize_student(student) for student in students_list]
 
     return students, 200
 
@@ -73,6 +158,8 @@ class AdminService:
     admin = Admin(**data)
 
     result = await collection_users.insert_one(admin.model_dump(by_alias=True, exclude={"id"}))
+    role_cache.invalidate(admin_api_key)
+    await role_cache.publish()
 
     if result.inserted_id:
       return jsonify({"message": "Admin successfully created",
@@ -101,10 +188,12 @@ class AdminService:
     student_api_key = generate_api_key()
     data["api_key"] = student_api_key
     student = Student(**data)
-    new_student = student.model_dump(by_alias=True, exclude={"id"})
-    db_model = User(**new_student).to_dict()
+    db_model = UserRecord(**student.model_dump(exclude={"created_at"})).to_dict()
 
     result = await collection_users.insert_one(db_model)
+    role_cache.invalidate(student_api_key)
+    await role_cache.publish()
+    student_search.add({**db_model, "_id": result.inserted_id})
 
     if result.inserted_id:
       return jsonify({"message": "Student was successfully created",
@@ -113,6 +202,82 @@ class AdminService:
 
     return jsonify({"error": "Failed to create student"}), 400
 
+  @staticmethod
+  async def bulk_create_students(rows: list[dict], api_key: str):
+    admin = await verify_user_role(api_key)
+    if not admin or admin != Role.ADMIN:
+      return {"error": "Not authorized"}, 401
+
+    report = [None] * len(rows)
+    seen_emails, seen_phone_numbers = set(), set()
+    valid_rows = []
+
+    for index, row in enumerate(rows):
+      errors = student_row_errors(row) if isinstance(row, dict) else ["Row must be an object"]
+      if not errors:
+        if row["email"] in seen_emails:
+          errors.append("Duplicate email in file")
+        if row["phone_number"] in seen_phone_numbers:
+          errors.append("Duplicate phone number in file")
+
+      if errors:
+        report[index] = {"row": index + 1, "status": "error", "errors": errors}
+        continue
+
+      seen_emails.add(row["email"])
+      seen_phone_numbers.add(row["phone_number"])
+      valid_rows.append((index, row))
+
+    for offset in range(0, len(valid_rows), BULK_BATCH_SIZE):
+      batch = valid_rows[offset:offset + BULK_BATCH_SIZE]
+      existing_emails, existing_phone_numbers = await find_existing_contacts(
+        [row["email"] for _, row in batch], [row["phone_number"] for _, row in batch])
+
+      pending = []
+      for index, row in batch:
+        errors = []
+        if row["email"] in existing_emails:
+          errors.append("Email already exists")
+        if row["phone_number"] in existing_phone_numbers:
+          errors.append("Phone number already exists")
+
+        if errors:
+          report[index] = {"row": index + 1, "status": "error", "errors": errors}
+          continue
+
+        try:
+          student = Student(**{field: row[field] for field in STUDENT_ROW_FIELDS}, api_key=generate_api_key())
+          document = UserRecord(**student.model_dump(exclude={"created_at"})).to_dict()
+        except (ValidationError, ValueError, TypeError) as e:
+          report[index] = {"row": index + 1, "status": "error", "errors": [str(e)]}
+          continue
+
+        pending.append((index, student, document))
+
+      if not pending:
+        continue
+
+      failed = {}
+      try:
+        await collection_users.insert_many([document for _, _, document in pending], ordered=False)
+      except BulkWriteError as e:
+        failed = {error["index"]: error.get("errmsg", "Insert failed") for error in e.details["writeErrors"]}
+
+      for position, (index, student, document) in enumerate(pending):
+        if position in failed:
+          report[index] = {"row": index + 1, "status": "error", "errors": [failed[position]]}
+          continue
+
+        role_cache.invalidate(student.api_key)
+        student_search.add(document)
+        report[index] = {"row": index + 1, "status": "created", "name": student.name,
+                         "email": student.email, "api_key": student.api_key}
+
+    created = sum(1 for result in report if result["status"] == "created")
+    if created:
+      await role_cache.publish()
+    return {"created": created, "failed": len(report) - created, "results": report}, 200
+
   @staticmethod
   async def delete_student(filters: DeleteStudent, api_key: str):
     admin = await verify_user_role(api_key)
@@ -125,11 +290,15 @@ class AdminService:
     if not query:
       return {"error": "At least one search parameter is required"}, 400
 
-    delete_result = await collection_users.delete_one(query)
+    deleted_user = await collection_users.find_one_and_delete(query, projection={"api_key": 1})
 
-    if delete_result.deleted_count == 0:
+    if not deleted_user:
       return jsonify({"message": "No students found"}), 404
 
+    role_cache.invalidate(deleted_user["api_key"])
+    await role_cache.publish()
+    student_search.remove(deleted_user["_id"])
+
   @staticmethod
   async def book_room(data: BookRoom, api_key: str):
     admin = await verify_user_role(api_key)
@@ -150,39 +319,150 @@ class AdminService:
 
       start_datetime, end_datetime = date_time
 
-      if not await is_room_available(data.room_name, start_datetime, end_datetime):
+      registered_room = room_registry.resolve(data.room_name)
+      if not registered_room:
+        return jsonify(f"Invalid room name provided: {data.room_name}"), 404
+
+      if not await is_room_available(registered_room.name, start_datetime, end_datetime):
         return jsonify({"error": f"The room {data.room_name} "
                                  f"is occupied during the specified time period."}), 409
 
-      if isinstance(data.room_name, str):
-        normalized_room_name = data.room_name.replace(" ", "_").upper()
-        if normalized_room_name in RoomsName.__members__:
-          room_name_enum = RoomsName[normalized_room_name]
-        else:
-          return jsonify(f"Invalid room name provided: {data.room_name}"), 404
-      else:
-        room_name_enum = data.room_name
-
-      room_type = determine_room_type(room_name_enum)
-      capacity = RoomCapacity[room_name_enum.name].value
-
-      room = Room(name=room_name_enum, room_type=room_type, capacity=capacity)
-      schedule = Schedule(rooms=room,
-                          start=start_datetime,
-                          end=end_datetime,
-                          group_name=data.group_name,
-                          activity=data.activity,
-                          status="confirmed")
+      room = RoomRecord(name=registered_room.name, room_type=registered_room.room_type,
+                        capacity=registered_room.capacity)
+      schedule = ScheduleRecord(rooms=room,
+                                start=start_datetime,
+                                end=end_datetime,
+                                group_name=data.group_name,
+                                activity=data.activity,
+                                status="confirmed")
+
+      schedule_dict = {"_id": ObjectId(), **schedule.to_dict()}
+      room_value = schedule_dict["rooms"]["room_name"]
+      if not await reserve(room_value, start_datetime, end_datetime, schedule_dict["_id"]):
+        return jsonify({"error": f"The room {data.room_name} "
+                                 f"is occupied during the specified time period."}), 409
 
-      schedule_dict = schedule.to_dict()
-      result = await collection_schedules.insert_one(schedule_dict)
+      try:
+        result = await collection_schedules.insert_one(schedule_dict)
+      except Exception:
+        await release(room_value, start_datetime, schedule_dict["_id"])
+        raise
       schedule_dict['_id'] = str(schedule_dict['_id'])
+      room_index.add(schedule_dict["rooms"]["room_name"], start_datetime, end_datetime, result.inserted_id)
+      await record_bookings([schedule_dict])
+      await record_changes("created", [schedule_dict])
+      await response_cache.bump()
 
       return {**schedule_dict, "_id": str(result.inserted_id)}
 
+    except ValueError as e:
+      return jsonify({"error": str(e)}), 400
     except Exception as e:
       return jsonify({"error": str(e)}), 500
 
+  @staticmethod
+  async def book_recurring(data: BookRecurring, api_key: str):
+    admin = await verify_user_role(api_key)
+    if not admin or admin != Role.ADMIN:
+      return {"error": "Not authorized"}, 401
+
+    registered_room = room_registry.resolve(data.room_name)
+    if not registered_room:
+      return {"error": f"Invalid room name provided: {data.room_name}"}, 404
+
+    if data.slots:
+      occurrences = []
+      for slot in data.slots:
+        date_time = is_time_valid(slot.start_time, slot.end_time) and combine_date_and_time(
+          slot.date, slot.start_time, slot.end_time)
+        if not date_time:
+          return {"error": f"Incorrect date or time in slot {slot.date} {slot.start_time}-{slot.end_time}"}, 400
+        occurrences.append(date_time)
+    else:
+      if not is_time_valid(data.start_time, data.end_time):
+        return {"error": "Incorrect deadlines"}, 400
+
+      occurrences = expand_recurrence(data.date, data.start_time, data.end_time, data.recurrence, data.until,
+                                      data.exceptions)
+      if occurrences is None:
+        return {"error": "Incorrect recurrence rule"}, 400
+
+    if not occurrences:
+      return {"error": "No occurrences to book"}, 400
+
+    occurrences.sort()
+    existing = await collection_schedules.find(
+      {"rooms.room_name": registered_room.name,
+       "start": {"$lt": occurrences[-1][1]},
+       "end": {"$gt": occurrences[0][0]}},
+      {"_id": 0, "start": 1, "end": 1}).sort("start", 1).to_list(length=None)
+
+    taken = [(to_naive_utc(booking["start"]), to_naive_utc(booking["end"])) for booking in existing]
+    accepted, conflicts = [], []
+    position = 0
+
+    for start_datetime, end_datetime in occurrences:
+      start, end = to_naive_utc(start_datetime), to_naive_utc(end_datetime)
+      while position < len(taken) and taken[position][1] <= start:
+        position += 1
+
+      clashes_existing = position < len(taken) and taken[position][0] < end
+      clashes_accepted = accepted and to_naive_utc(accepted[-1][1]) > start
+      if clashes_existing or clashes_accepted:
+        conflicts.append({"start": start_datetime, "end": end_datetime})
+      else:
+        accepted.append((start_datetime, end_datetime))
+
+    if conflicts and data.on_conflict == "reject":
+      return {"error": f"The room {data.room_name} is occupied for some occurrences.", "conflicts": conflicts}, 409
+
+    if not accepted:
+      return {"error": "All occurrences conflict with existing bookings.", "conflicts": conflicts}, 409
+
+    series_id = str(ObjectId())
+    room = RoomRecord(name=registered_room.name, room_type=registered_room.room_type,
+                      capacity=registered_room.capacity)
+    try:
+      documents = [{"_id": ObjectId(), **ScheduleRecord(rooms=room,
+                                                      start=start_datetime,
+                                                      end=end_datetime,
+                                                      group_name=data.group_name,
+                                                      activity=data.activity,
+                                                      status="confirmed").to_dict(), "series_id": series_id}
+                   for start_datetime, end_datetime in accepted]
+    except ValueError as e:
+      return {"error": str(e)}, 400
+
+    reserved = await reserve_many(registered_room.name, [(document["start"], document["end"], document["_id"])
+                                                          for document in documents])
+    lost = [document for document, ok in zip(documents, reserved) if not ok]
+    documents = [document for document, ok in zip(documents, reserved) if ok]
+    conflicts.extend({"start": document["start"], "end": document["end"]} for document in lost)
+
+    if not documents or (lost and data.on_conflict == "reject"):
+      for document in documents:
+        await release(registered_room.name, document["start"], document["_id"])
+      return {"error": f"The room {data.room_name} is occupied for some occurrences.", "conflicts": conflicts}, 409
+
+    try:
+      result = await collection_schedules.insert_many(documents)
+    except Exception:
+      await collection_schedules.delete_many({"_id": {"$in": [document["_id"] for document in documents]}})
+      for document in documents:
+        await release(registered_room.name, document["start"], document["_id"])
+      raise
+
+    for document, inserted_id in zip(documents, result.inserted_ids):
+      room_index.add(registered_room.name, document["start"], document["end"], inserted_id)
+    await record_bookings(documents)
+    await record_changes("created", documents)
+    await response_cache.bump()
+
+    booked = [{"_id": str(inserted_id), "start": document["start"], "end": document["end"]}
+              for document, inserted_id in zip(documents, result.inserted_ids)]
+
+    return {"series_id": series_id, "booked": booked, "conflicts": conflicts}, 201
+
   @staticmethod
   async def cancel_room(cancel_room: CancelBooking, api_key: str):
     admin = await verify_user_role(api_key)
@@ -196,23 +476,125 @@ class AdminService:
       if not start_datetime or not end_datetime:
         return jsonify({"error": "Invalid date or time format."}), 400
 
-      cancel = cancel_room.model_dump(by_alias=True)
+      registered_room = room_registry.resolve(cancel_room.room_name)
+      room_name = registered_room.name if registered_room else cancel_room.room_name
       data = {
-        "rooms.room_name": cancel["room_name"],
+        "rooms.room_name": room_name,
         "start": start_datetime,
         "end": end_datetime,
       }
 
-      room_available = await is_room_available(cancel_room.room_name, start_datetime, end_datetime)
-      if room_available:
-        return jsonify({"error": "No matching booking found for cancellation."}), 404
+      deleted = await collection_schedules.find_one_and_delete(data)
 
-      result = await collection_schedules.delete_one(data)
-
-      if result.deleted_count == 0:
+      if not deleted:
         return jsonify({"error": "No matching bookings found for cancellation."}), 404
 
-      return jsonify({"success": f"{result.deleted_count} booking(s) deleted."}), 200
+      room_index.remove(room_name, start_datetime, end_datetime)
+      await release(deleted["rooms"]["room_name"], deleted["start"], deleted["_id"])
+      await record_bookings([deleted], sign=-1)
+      await record_changes("cancelled", [deleted])
+      await response_cache.bump()
+
+      return jsonify({"success": "1 booking(s) deleted."}), 200
 
     except Exception as e:
       return jsonify({"error": str(e)}), 500
+
+  @staticmethod
+  async def list_rooms(api_key: str):
+    admin = await verify_user_role(api_key)
+    if not admin or admin != Role.ADMIN:
+      return {"error": "Not authorized"}, 401
+
+    return [{"id": room.id, "name": room.name, "room_type": room.room_type.value, "capacity": room.capacity}
+            for room in room_registry.rooms], 200
+
+  @staticmethod
+  async def save_room(data: RoomEdit, api_key: str):
+    admin = await verify_user_role(api_key)
+    if not admin or admin != Role.ADMIN:
+      return {"error": "Not authorized"}, 401
+
+    room_id = data.id or data.name.strip().replace(" ", "_").upper()
+    for spelling in (data.name, *data.aliases):
+      taken_by = room_registry.resolve(spelling)
+      if taken_by and taken_by.id != room_id:
+        return {"error": f"'{spelling}' already refers to the room {taken_by.name}"}, 409
+
+    current = room_registry.resolve(room_id)
+    if current and current.id == room_id and current.name != data.name:
+      if await collection_schedules.count_documents({"rooms.room_name": current.name}, limit=1):
+        return {"error": f"The room {current.name} has bookings; add '{data.name}' as an alias instead"}, 409
+    if current and current.id == room_id and current.room_type.value != data.room_type:
+      if await collection_schedules.count_documents({"rooms.room_name": current.name}, limit=1):
+        return {"error": f"The room {current.name} has bookings; its type cannot change"}, 409
+
+    room = await room_registry.save(room_id, data.name, data.room_type, data.capacity, data.aliases)
+    return {"id": room.id, "name": room.name, "room_type": room.room_type.value, "capacity": room.capacity}, 200
+
+  @staticmethod
+  async def delete_room(room_name: str, api_key: str):
+    admin = await verify_user_role(api_key)
+    if not admin or admin != Role.ADMIN:
+      return {"error": "Not authorized"}, 401
+
+    room = room_registry.resolve(room_name)
+    if not room:
+      return {"error": f"Invalid room name provided: {room_name}"}, 404
+
+    if await collection_schedules.count_documents({"rooms.room_name": room.name, "end": {"$gt": datetime.utcnow()}},
+                                                  limit=1):
+      return {"error": f"The room {room.name} has upcoming bookings"}, 409
+
+    await room_registry.delete(room.id)
+    return {"success": f"Room {room.name} deleted."}, 200
+
+  @staticmethod
+  async def get_room_analytics(api_key: str, date_from, date_to, room_name: str | None):
+    admin = await verify_user_role(api_key)
+    if not admin or admin != Role.ADMIN:
+      return {"error": "Not authorized"}, 401
+
+    query = {}
+    if room_name:
+      query["room_name"] = room_name
+    if date_from or date_to:
+      query["day"] = {}
+      if date_from:
+        query["day"]["$gte"] = to_naive_utc(date_from)
+      if date_to:
+        query["day"]["$lt"] = to_naive_utc(date_to)
+
+    rollups = await collection_rollups.find(query, {"_id": 0}).sort([("room_name", 1), ("day", 1)]).to_list(
+      length=None)
+
+    rooms = {}
+    for rollup in rollups:
+      registered_room = room_registry.resolve(rollup["room_name"])
+      capacity = registered_room.capacity if registered_room else None
+
+      room = rooms.setdefault(rollup["room_name"], {
+        "room_type": rollup.get("room_type"),
+        "capacity": capacity,
+        "booked_minutes": 0,
+        "booking_count": 0,
+        "peak_requested_capacity": 0,
+        "activities": {},
+        "days": [],
+      })
+
+      room["booked_minutes"] += rollup.get("booked_minutes", 0)
+      room["booking_count"] += rollup.get("booking_count", 0)
+      room["peak_requested_capacity"] = max(room["peak_requested_capacity"],
+                                            rollup.get("peak_requested_capacity") or 0)
+      for activity, totals in rollup.get("activities", {}).items():
+        activity_totals = room["activities"].setdefault(activity, {"minutes": 0, "count": 0})
+        activity_totals["minutes"] += totals.get("minutes", 0)
+        activity_totals["count"] += totals.get("count", 0)
+      room["days"].append(rollup)
+
+    for room in rooms.values():
+      if room["capacity"]:
+        room["peak_utilization"] = round(room["peak_requested_capacity"] / room["capacity"], 3)
+
+    return rooms, 200
@@ -1,23 +1,37 @@
 from collections import defaultdict
+from datetime import datetime, timezone
 
+import numpy as np
+import orjson
+from bson import ObjectId
 from quart import jsonify
 
 from app.database.mongoDB import collection_schedules
-from app.models.schedule import RoomsName, Room, Schedule, RoomCapacity
+from app.models.codec import RoomRecord, ScheduleRecord
 from app.models.users import Role
 from app.schemas.students import BookingNotification
+from app.utils.archive import booking_archiver
+from app.utils.change_log import encode_token, decode_token, current_sequence, changes_since
 from app.utils.check_role import verify_user_role
-from app.utils.fix_enum import determine_room_type
+from app.utils.free_slots import to_epoch_seconds, off_hours, find_gaps
+from app.utils.json_provider import dumps_bytes
+from app.utils.pagination import encode_cursor, decode_cursor, page_size
+from app.utils.room_index import to_naive_utc
+from app.utils.room_registry import room_registry
 from app.utils.time_managment import is_time_valid, combine_date_and_time, is_room_available
 
+SCHEDULE_PROJECTION = {"_id": 0, "rooms.room_type": 1, "rooms.room_name": 1, "start": 1, "end": 1,
+                       "group_name": 1, "activity": 1}
+BOOKING_PROJECTION = {**SCHEDULE_PROJECTION, "_id": 1}
+BOOKING_SORT = [("start", 1), ("_id", 1)]
+
 
 class StudentService:
   @staticmethod
-  async def get_all_rooms():
-    all_rooms = await collection_schedules.find({}, {"_id": 0}).to_list(length=None)
+  def group_schedules(schedules):
     room_info = defaultdict(lambda: defaultdict(list))
 
-    for schedule in all_rooms:
+    for schedule in schedules:
       room_data = schedule.get("rooms", {})
       room_type = room_data.get("room_type")
       room_name = room_data.get("room_name")
@@ -35,30 +49,139 @@ class StudentService:
     return room_info
 
   @staticmethod
-  async def filtered_rooms(room_name, room_type):
-    all_rooms = await StudentService.get_all_rooms()
-    filtered_info = defaultdict(lambda: defaultdict(list))
+  async def get_all_rooms():
+    all_rooms = await collection_schedules.find({}, SCHEDULE_PROJECTION).to_list(length=None)
+    return StudentService.group_schedules(all_rooms)
 
-    if not all_rooms:
-      return jsonify({"message": "No rooms data available."}), 404
+  @staticmethod
+  def serialize_booking(schedule: dict):
+    room_data = schedule.get("rooms", {})
+    return {
+      "id": str(schedule["_id"]),
+      "room_type": room_data.get("room_type"),
+      "room_name": room_data.get("room_name"),
+      "start": schedule.get("start"),
+      "end": schedule.get("end"),
+      "group_name": schedule.get("group_name"),
+      "activity": schedule.get("activity")
+    }
 
-    for room_type_key, rooms in all_rooms.items():
-      if room_type and room_type_key != room_type:
-        continue
+  @staticmethod
+  async def get_rooms_page(limit: int | None, cursor: str | None):
+    query = {}
+    if cursor:
+      parts = decode_cursor(cursor)
+      try:
+        last_start, last_id = datetime.fromisoformat(parts[0]), ObjectId(parts[1])
+      except Exception:
+        return {"error": "Invalid cursor"}, 400
 
-      for room_name_key, schedules in rooms.items():
-        if room_name and room_name_key != room_name:
-          continue
+      query = {"$or": [{"start": {"$gt": last_start}}, {"start": last_start, "_id": {"$gt": last_id}}]}
+
+    size = page_size(limit)
+    schedules = await (collection_schedules.find(query, BOOKING_PROJECTION)
+                       .sort(BOOKING_SORT).limit(size).to_list(length=size))
+
+    next_cursor = None
+    if len(schedules) == size:
+      last = schedules[-1]
+      next_cursor = encode_cursor(last["start"].isoformat(), str(last["_id"]))
+
+    return {"bookings": [StudentService.serialize_booking(schedule) for schedule in schedules],
+            "next_cursor": next_cursor}, 200
+
+  @staticmethod
+  def stream_rooms():
+    # Quart drains the body after the request context is gone, so the cursor is bound to the client now.
+    cursor = collection_schedules.find({}, BOOKING_PROJECTION).sort(BOOKING_SORT)
 
-        filtered_info[room_type_key][room_name_key] = schedules
+    async def rows():
+      async for schedule in cursor:
+        yield dumps_bytes(StudentService.serialize_booking(schedule), orjson.OPT_APPEND_NEWLINE)
 
-    if not filtered_info:
+    return rows()
+
+  @staticmethod
+  async def get_changes(since: str | None, limit: int | None):
+    if not since:
+      return {"changes": [], "token": encode_token(await current_sequence()), "has_more": False}, 200
+
+    sequence = decode_token(since)
+    if sequence is None:
+      return {"error": "Invalid token"}, 400
+
+    changes = await changes_since(sequence, page_size(limit))
+    if changes is None:
+      return {"error": "Token has expired; download the full schedule again"}, 410
+
+    return changes, 200
+
+  @staticmethod
+  async def filtered_rooms(room_name, room_type, date_from=None, date_to=None):
+    query = {}
+    if room_name:
+      registered_room = room_registry.resolve(room_name)
+      query["rooms.room_name"] = registered_room.name if registered_room else room_name
+    if room_type:
+      query["rooms.room_type"] = room_type
+    if date_from:
+      query["end"] = {"$gt": date_from}
+    if date_to:
+      query["start"] = {"$lt": date_to}
+
+    matching_rooms = await booking_archiver.find(query, SCHEDULE_PROJECTION, date_from, date_to)
+
+    if not matching_rooms:
       return jsonify({"message": "No matching rooms found."}), 404
 
+    filtered_info = StudentService.group_schedules(matching_rooms)
     filtered_info_dict = {k: dict(v) for k, v in filtered_info.items()}
 
     return filtered_info_dict
 
+  @staticmethod
+  async def find_free_slots(date_from: datetime, date_to: datetime, min_duration: int, capacity: int,
+                            day_start: int = 0, day_end: int = 86400):
+    rooms = [room for room in room_registry.rooms if room.capacity >= capacity]
+    if not rooms:
+      return {"error": f"No room has a capacity of {capacity}"}, 404
+
+    bookings = await booking_archiver.find(
+      {"rooms.room_name": {"$in": [room.name for room in rooms]},
+       "start": {"$lt": date_to},
+       "end": {"$gt": date_from}},
+      {"_id": 0, "rooms.room_name": 1, "start": 1, "end": 1}, date_from, date_to)
+
+    positions = {room.name: position for position, room in enumerate(rooms)}
+    room_ids = np.fromiter((positions[booking["rooms"]["room_name"]] for booking in bookings), dtype=np.int64,
+                           count=len(bookings))
+    starts = to_epoch_seconds([to_naive_utc(booking["start"]) for booking in bookings])
+    ends = to_epoch_seconds([to_naive_utc(booking["end"]) for booking in bookings])
+
+    window_start, window_end = to_epoch_seconds([to_naive_utc(date_from), to_naive_utc(date_to)])
+    closed_starts, closed_ends = off_hours(window_start, window_end, day_start, day_end)
+
+    gap_rooms, gap_starts, gap_ends = find_gaps(
+      np.concatenate((room_ids, np.repeat(np.arange(len(rooms)), len(closed_starts)))),
+      np.concatenate((starts, np.tile(closed_starts, len(rooms)))),
+      np.concatenate((ends, np.tile(closed_ends, len(rooms)))),
+      len(rooms), window_start, window_end, min_duration)
+
+    free_rooms = {}
+    boundaries = np.flatnonzero(np.diff(gap_rooms)) + 1
+    firsts = np.concatenate(([0], boundaries)) if len(gap_rooms) else boundaries
+    for first, room_starts, room_ends in zip(firsts, np.split(gap_starts, boundaries), np.split(gap_ends, boundaries)):
+      room = rooms[gap_rooms[first]]
+      free_rooms[room.name] = {
+        "room_type": room.room_type.value,
+        "capacity": room.capacity,
+        "free": [{"start": datetime.fromtimestamp(start, timezone.utc),
+                  "end": datetime.fromtimestamp(end, timezone.utc)}
+                 for start, end in zip(room_starts.tolist(), room_ends.tolist())]
+      }
+
+    return free_rooms, 200
+
   @staticmethod
   async def send_book_room_notification(data: BookingNotification, api_key: str):
     student = await verify_user_role(api_key)
@@ -79,39 +202,36 @@ class StudentService:
 
       start_datetime, end_datetime = date_time
 
-      is_available = await is_room_available(data.room_name, start_datetime, end_datetime)
+      registered_room = room_registry.resolve(data.room_name)
+      if not registered_room:
+        return {"error": f"Invalid room name provided: {data.room_name}"}, 400
+
+      is_available = await is_room_available(registered_room.name, start_datetime, end_datetime)
       if not is_available:
         return {"error": f"The room {data.room_name} is occupied during the specified time period."}, 409
 
-      if isinstance(data.room_name, str):
-        normalized_room_name = data.room_name.replace(" ", "_").upper()
-        if normalized_room_name in RoomsName.__members__:
-          room_name_enum = RoomsName[normalized_room_name]
-        else:
-          return {"error": f"Invalid room name provided: {data.room_name}"}, 400
-      else:
-        room_name_enum = data.room_name
-
-      room_type = determine_room_type(room_name_enum)
-      max_capacity = RoomCapacity[room_name_enum.name].value
+      max_capacity = registered_room.capacity
       requested_capacity = data.capacity
 
       if requested_capacity > max_capacity:
         return {"error": f"The room {data.room_name} has a maximum capacity of {max_capacity}. "
                          f"Requested: {requested_capacity}"}, 409
 
-      room = Room(name=room_name_enum, room_type=room_type, capacity=requested_capacity)
-      schedule = Schedule(
+      room = RoomRecord(name=registered_room.name, room_type=registered_room.room_type, capacity=requested_capacity)
+      schedule = ScheduleRecord(
         rooms=room,
         start=start_datetime,
         end=end_datetime,
         group_name=data.group_name,
-        activity=data.activity
+        activity=data.activity,
+        requested_capacity=requested_capacity
       )
 
       schedule_dict = schedule.to_dict()
 
       return {"success": True, "schedule": schedule_dict}, 200
 
+    except ValueError as e:
+      return {"error": str(e)}, 400
     except Exception as e:
       return {"error": str(e)}, 500
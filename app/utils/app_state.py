@@ -0,0 +1,20 @@
+from quart import current_app, has_app_context
+from werkzeug.local import LocalProxy
+
+def init_app_state(app, **instances):
+  app.extensions["classroom"] = instances
+
+
+def app_instance(name: str, factory):
+  # A silent process-wide fallback would open its own Mongo client that nothing ever closes.
+  if not has_app_context():
+    raise RuntimeError(f"{name} is only available inside an application context")
+  instances = current_app.extensions.setdefault("classroom", {})
+  instance = instances.get(name)
+  if instance is None:
+    instance = instances[name] = factory()
+  return instance
+
+
+def app_local(name: str, factory):
+  return LocalProxy(lambda: app_instance(name, factory))
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.config.settings import settings
+from app.database.indexes import ARCHIVE_INDEXES
+from app.database.mongoDB import get_database, collection_schedules, collection_archive_state
+from app.utils.app_state import app_local
+from app.utils.response_cache import response_cache
+from app.utils.room_index import room_index, to_naive_utc
+
+STATE_ID = "schedules"
+LEASE_ID = "archiver_lease"
+STATE_MAX_AGE = 60
+DUPLICATE_KEY = 11000
+
+logger = logging.getLogger(__name__)
+
+
+def term_of(moment: datetime) -> str:
+  return f"{moment.year}_{'spring' if moment.month <= 6 else 'autumn'}"
+
+
+def term_bounds(term: str) -> tuple[datetime, datetime]:
+  year, season = term.split("_")
+  year = int(year)
+  if season == "spring":
+    return datetime(year, 1, 1), datetime(year, 7, 1)
+  return datetime(year, 7, 1), datetime(year + 1, 1, 1)
+
+
+def archive_collection(term: str):
+  return get_database()[f"schedules_archive_{term}"]
+
+
+class BookingArchiver:
+  def __init__(self):
+    self.archived_before = None
+    self.terms = set()
+    self.indexed = set()
+    self.loaded_at = None
+    self.worker = None
+    self.archived = 0
+    self.failed = 0
+    self.last_error = None
+    self.owner = str(ObjectId())
+
+  async def load(self):
+    state = await collection_archive_state.find_one({"_id": STATE_ID}) or {}
+    archived_before = state.get("archived_before")
+    self.archived_before = to_naive_utc(archived_before) if archived_before else None
+    self.terms = set(state.get("terms", []))
+    self.loaded_at = time.monotonic()
+
+  async def refresh_if_stale(self):
+    if self.loaded_at is None or time.monotonic() - self.loaded_at > STATE_MAX_AGE:
+      await self.load()
+
+  async def collections_for(self, date_from: datetime | None, date_to: datetime | None):
+    await self.refresh_if_stale()
+    collections = [collection_schedules]
+    if self.archived_before is None or (date_from is None and date_to is None):
+      return collections
+
+    lower = to_naive_utc(date_from) if date_from else None
+    upper = to_naive_utc(date_to) if date_to else None
+    if lower is not None and lower >= self.archived_before:
+      return collections
+
+    for term in sorted(self.terms):
+      term_start, term_end = term_bounds(term)
+      if (lower is None or lower < term_end) and (upper is None or term_start < upper):
+        collections.append(archive_collection(term))
+
+    return collections
+
+  async def find(self, query: dict, projection: dict, date_from: datetime | None = None,
+                 date_to: datetime | None = None) -> list[dict]:
+    collections = await self.collections_for(date_from, date_to)
+    if len(collections) == 1:
+      return await collection_schedules.find(query, projection).to_list(length=None)
+
+    # A batch is briefly in both the hot and the archive collection while it is moved.
+    keep_id = projection.get("_id", 1)
+    seen, results = set(), []
+    for collection in collections:
+      async for schedule in collection.find(query, {**projection, "_id": 1}):
+        if schedule["_id"] in seen:
+          continue
+        seen.add(schedule["_id"])
+        if not keep_id:
+          del schedule["_id"]
+        results.append(schedule)
+
+    return results
+
+  async def mark(self, cutoff: datetime, terms: set[str]):
+    await collection_archive_state.update_one(
+      {"_id": STATE_ID},
+      {"$max": {"archived_before": cutoff}, "$addToSet": {"terms": {"$each": sorted(terms)}}},
+      upsert=True)
+    self.archived_before = max(filter(None, (self.archived_before, cutoff)))
+    self.terms |= terms
+
+  async def move(self, term: str, schedules: list[dict]):
+    collection = archive_collection(term)
+    if term not in self.indexed:
+      await collection.create_indexes(ARCHIVE_INDEXES)
+      self.indexed.add(term)
+
+    try:
+      await collection.insert_many(schedules, ordered=False)
+    except BulkWriteError as e:
+      if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+        raise
+
+    await collection_schedules.delete_many({"_id": {"$in": [schedule["_id"] for schedule in schedules]}})
+    for schedule in schedules:
+      room_index.remove(schedule["rooms"]["room_name"], schedule["start"], schedule["end"])
+
+  async def archive_once(self) -> int:
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    cutoff = today - timedelta(days=settings.ARCHIVE_HORIZON_DAYS)
+    batch_size = settings.ARCHIVE_BATCH_SIZE
+    moved = 0
+
+    while True:
+      batch = await (collection_schedules.find({"end": {"$lt": cutoff}})
+                     .sort("end", 1).limit(batch_size).to_list(length=batch_size))
+      if not batch:
+        break
+
+      by_term = {}
+      for schedule in batch:
+        by_term.setdefault(term_of(to_naive_utc(schedule["start"])), []).append(schedule)
+
+      await self.mark(cutoff, set(by_term))
+      for term, schedules in by_term.items():
+        await self.move(term, schedules)
+
+      moved += len(batch)
+
+    if moved:
+      self.archived += moved
+      await response_cache.bump()
+    return moved
+
+  async def acquire_lease(self) -> bool:
+    now = datetime.utcnow()
+    try:
+      await collection_archive_state.update_one(
+        {"_id": LEASE_ID, "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}]},
+        {"$set": {"owner": self.owner, "expires_at": now + timedelta(seconds=2 * settings.ARCHIVE_INTERVAL)}},
+        upsert=True)
+    except DuplicateKeyError:
+      return False
+    return True
+
+  async def release_lease(self):
+    await collection_archive_state.delete_one({"_id": LEASE_ID, "owner": self.owner})
+
+  async def start(self):
+    if self.worker:
+      return
+    await self.load()
+    self.worker = asyncio.create_task(self.run())
+
+  async def stop(self):
+    if self.worker:
+      self.worker.cancel()
+      try:
+        await self.worker
+      except asyncio.CancelledError:
+        pass
+      self.worker = None
+      await self.release_lease()
+
+  async def run(self):
+    while True:
+      try:
+        if await self.acquire_lease():
+          await self.archive_once()
+      except Exception as e:
+        logger.exception("Archiving bookings failed")
+        self.failed += 1
+        self.last_error = str(e)
+      await asyncio.sleep(settings.ARCHIVE_INTERVAL)
+
+  def stats(self):
+    return {
+      "archived": self.archived,
+      "failed": self.failed,
+      "last_error": self.last_error,
+      "archived_before": self.archived_before,
+      "terms": sorted(self.terms),
+    }
+
+
+booking_archiver = app_local("booking_archiver", BookingArchiver)
+
+
+if __name__ == "__main__":
+  from app.main import run_in_app
+  asyncio.run(run_in_app(lambda: booking_archiver.archive_once()))
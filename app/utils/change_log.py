@@ -0,0 +1,148 @@
+import logging
+from datetime import datetime, timedelta
+from enum import Enum
+
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from app.database.mongoDB import collection_changes, collection_counters
+from app.utils.pagination import encode_cursor, decode_cursor
+
+CHANGE_COUNTER = "schedule_changes"
+CHANGE_OPERATIONS = frozenset(("created", "confirmed", "cancelled"))
+# Fills a sequence number that was taken but never written, so readers can move past it.
+SKIPPED = "skipped"
+# A gap younger than this is most likely a change whose sequence number was taken but not yet written.
+GAP_GRACE = timedelta(seconds=5)
+DUPLICATE_KEY = 11000
+
+logger = logging.getLogger(__name__)
+
+
+def enum_value(value):
+  return value.value if isinstance(value, Enum) else value
+
+
+def change_booking(schedule: dict) -> dict:
+  rooms = schedule.get("rooms", {})
+  return {
+    "id": str(schedule["_id"]),
+    "room_type": enum_value(rooms.get("room_type")),
+    "room_name": enum_value(rooms.get("room_name")),
+    "start": schedule.get("start"),
+    "end": schedule.get("end"),
+    "group_name": schedule.get("group_name"),
+    "activity": enum_value(schedule.get("activity")),
+  }
+
+
+def encode_token(sequence: int) -> str:
+  return encode_cursor(str(sequence))
+
+
+def decode_token(token: str) -> int | None:
+  parts = decode_cursor(token)
+  try:
+    sequence = int(parts[0])
+  except (TypeError, ValueError):
+    return None
+  return sequence if sequence >= 0 else None
+
+
+async def record_changes(operation: str, schedules: list[dict]):
+  if operation not in CHANGE_OPERATIONS:
+    raise ValueError(f"Invalid change operation: {operation}")
+  if not schedules:
+    return
+
+  # The bookings are already written; a lost change must not fail the request that made them.
+  try:
+    await write_changes(operation, schedules)
+  except Exception:
+    logger.exception("Recording %d %s changes failed", len(schedules), operation)
+
+
+async def write_changes(operation: str, schedules: list[dict]):
+  recorded_at = datetime.utcnow()
+  counter = await collection_counters.find_one_and_update(
+    {"_id": CHANGE_COUNTER}, {"$inc": {"seq": len(schedules)}, "$set": {"at": recorded_at}}, upsert=True,
+    return_document=ReturnDocument.AFTER)
+  first = counter["seq"] - len(schedules) + 1
+
+  try:
+    await collection_changes.insert_many([
+      {"_id": first + offset, "op": operation, "booking": change_booking(schedule), "at": recorded_at}
+      for offset, schedule in enumerate(schedules)], ordered=False)
+  except BulkWriteError as e:
+    errors = e.details["writeErrors"]
+    if any(error["code"] != DUPLICATE_KEY for error in errors):
+      raise
+    # A reader gave up on these sequence numbers while we were slow; record them again at the end of the log.
+    await write_changes(operation, [schedules[error["index"]] for error in errors])
+
+
+async def skip_sequences(sequences: list[int]):
+  skipped_at = datetime.utcnow()
+  try:
+    await collection_changes.insert_many([{"_id": sequence, "op": SKIPPED, "at": skipped_at}
+                                          for sequence in sequences], ordered=False)
+  except BulkWriteError as e:
+    if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+      raise
+
+
+async def current_sequence() -> int:
+  counter = await collection_counters.find_one({"_id": CHANGE_COUNTER})
+  return counter["seq"] if counter else 0
+
+
+def stale_gaps(since: int, changes: list[dict], now: datetime) -> list[int]:
+  missing, expected = [], since + 1
+  for change in changes:
+    if change["_id"] != expected:
+      if now - change["at"] < GAP_GRACE:
+        break
+      missing.extend(range(expected, change["_id"]))
+    expected = change["_id"] + 1
+  return missing
+
+
+async def fetch_changes(since: int, limit: int) -> list[dict]:
+  return await (collection_changes.find({"_id": {"$gt": since}})
+                .sort("_id", 1).limit(limit).to_list(length=limit))
+
+
+async def changes_since(since: int, limit: int):
+  oldest = await collection_changes.find_one({}, {"_id": 1}, sort=[("_id", 1)])
+  if oldest:
+    if since < oldest["_id"] - 1:
+      return None
+  else:
+    # An empty log after expiry still has to reject tokens that predate the last change.
+    counter = await collection_counters.find_one({"_id": CHANGE_COUNTER}) or {}
+    taken_at = counter.get("at")
+    if since < counter.get("seq", 0) and (taken_at is None or datetime.utcnow() - taken_at >= GAP_GRACE):
+      return None
+
+  changes = await fetch_changes(since, limit)
+
+  # Writes that never landed are filled in rather than skipped, so a late writer notices and records again.
+  missing = stale_gaps(since, changes, datetime.utcnow())
+  if missing:
+    await skip_sequences(missing)
+    changes = await fetch_changes(since, limit)
+
+  settled, expected = [], since + 1
+  for change in changes:
+    if change["_id"] != expected:
+      break
+    settled.append(change)
+    expected = change["_id"] + 1
+
+  last = settled[-1]["_id"] if settled else since
+  return {
+    "changes": [{"sequence": change["_id"], "op": change["op"], "booking": change["booking"]} for change in settled
+                if change["op"] != SKIPPED],
+    "token": encode_token(last),
+    "has_more": len(settled) < len(changes) or len(changes) == limit,
+  }
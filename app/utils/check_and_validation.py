@@ -4,43 +4,66 @@ from quart import jsonify
 
 from app.database.mongoDB import collection_users
 
+NAME_REGEX = re.compile(r"^[a-zA-Z]{3,50}$")
+GROUP_NAME_REGEX = re.compile(r"^[a-zA-Z0-9/]{2,20}$")
+EMAIL_REGEX = re.compile(r"(^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$)")
+PHONE_NUMBER_REGEX = re.compile(r"^\+?\d{10,15}$")
+
+NAME_MESSAGE = "Name must contain only letters and be between 3 and 50 characters"
+SURNAME_MESSAGE = "Surname must contain only letters and be between 3 and 50 characters"
+GROUP_NAME_MESSAGE = ("Group name must contain only letters, numbers, and '/' "
+                      "character, and be between 3 and 50 characters")
+EMAIL_MESSAGE = "Invalid email address"
+PHONE_NUMBER_MESSAGE = "Phone number must contain only digits and be 10-15 characters long"
+
+STUDENT_FIELD_RULES = [
+  ("name", NAME_REGEX, NAME_MESSAGE),
+  ("surname", NAME_REGEX, SURNAME_MESSAGE),
+  ("email", EMAIL_REGEX, EMAIL_MESSAGE),
+  ("phone_number", PHONE_NUMBER_REGEX, PHONE_NUMBER_MESSAGE),
+  ("group_name", GROUP_NAME_REGEX, GROUP_NAME_MESSAGE),
+]
+STUDENT_ROW_FIELDS = tuple(field for field, _, _ in STUDENT_FIELD_RULES)
+EXTRA_VALUES_MESSAGE = "Row has more values than the header has columns"
+
+
+def student_row_errors(row: dict) -> list[str]:
+  # csv.DictReader files surplus values under a None key.
+  errors = [EXTRA_VALUES_MESSAGE] if any(not isinstance(key, str) for key in row) else []
+  for field, regex, message in STUDENT_FIELD_RULES:
+    value = row.get(field)
+    if not isinstance(value, str) or not regex.match(value):
+      errors.append(message)
+  return errors
+
 
 async def check_valid_name(name: str):
-  name_regex = r"^[a-zA-Z]{3,50}$"
-  if not re.match(name_regex, name):
-    return jsonify({"message": "Name must contain only letters "
-                               "and be between 3 and 50 characters"}), 400
+  if not NAME_REGEX.match(name):
+    return jsonify({"message": NAME_MESSAGE}), 400
   return None
 
 
 async def check_valid_surname(surname: str):
-  surname_regex = r"^[a-zA-Z]{3,50}$"
-  if not re.match(surname_regex, surname):
-    return jsonify({"message": "Surname must contain only letters "
-                               "and be between 3 and 50 characters"}), 400
+  if not NAME_REGEX.match(surname):
+    return jsonify({"message": SURNAME_MESSAGE}), 400
   return None
 
 
 async def check_valid_group_name(group_name: str):
-  group_name_regex = r"^[a-zA-Z0-9/]{2,20}$"
-  if not re.match(group_name_regex, group_name):
-    return jsonify({
-      "message": "Group name must contain only letters, numbers, and '/' "
-                 "character, and be between 3 and 50 characters"}), 400
+  if not GROUP_NAME_REGEX.match(group_name):
+    return jsonify({"message": GROUP_NAME_MESSAGE}), 400
   return None
 
 
 async def check_valid_email(email: str):
-  email_regex = r"(^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$)"
-  if not re.match(email_regex, email):
-    return jsonify({"message": "Invalid email address"}), 400
+  if not EMAIL_REGEX.match(email):
+    return jsonify({"message": EMAIL_MESSAGE}), 400
   return None
 
 
 async def check_valid_phone_number(phone_number: str):
-  phone_number_regex = r"^\+?\d{10,15}$"
-  if not re.match(phone_number_regex, phone_number):
-    return jsonify({"message": "Phone number must contain only digits and be 10-15 characters long"}), 400
+  if not PHONE_NUMBER_REGEX.match(phone_number):
+    return jsonify({"message": PHONE_NUMBER_MESSAGE}), 400
   return None
 
 
@@ -56,3 +79,16 @@ async def check_phone_number_exists(phone_number: str):
   if user:
     return jsonify({"message": "Phone number already exists"}), 400
   return None
+
+
+async def find_existing_contacts(emails: list[str], phone_numbers: list[str]):
+  cursor = collection_users.find(
+    {"$or": [{"email": {"$in": emails}}, {"phone_number": {"$in": phone_numbers}}]},
+    {"_id": 0, "email": 1, "phone_number": 1})
+
+  existing_emails, existing_phone_numbers = set(), set()
+  async for user in cursor:
+    existing_emails.add(user.get("email"))
+    existing_phone_numbers.add(user.get("phone_number"))
+
+  return existing_emails, existing_phone_numbers
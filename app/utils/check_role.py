@@ -1,16 +1,114 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from app.config.settings import settings
 from app.database.mongoDB import collection_users
 from app.models.users import Role
+from app.utils.app_state import app_local
+from app.utils.shared_generation import SharedGeneration
 
+ROLE_VALUES = {r.value for r in Role}
 
-async def verify_user_role(api_key: str):
-  user = await collection_users.find_one({"api_key": api_key})
+
+class LookupAbandoned(Exception):
+  pass
+
+
+class RoleCache:
+  def __init__(self):
+    self.entries = OrderedDict()
+    self.pending = {}
+    self.hits = 0
+    self.misses = 0
+    # Deletions and new keys on any worker clear every worker's cache within ROLE_CACHE_CHECK_INTERVAL.
+    self.shared = SharedGeneration("role_cache")
+
+  async def refresh(self):
+    if await self.shared.changed(settings.ROLE_CACHE_CHECK_INTERVAL):
+      self.entries.clear()
+
+  async def publish(self):
+    await self.shared.bump()
+
+  def get(self, api_key: str):
+    entry = self.entries.get(api_key)
+    if entry is None:
+      return False, None
+
+    role, expires_at = entry
+    if expires_at < time.monotonic():
+      del self.entries[api_key]
+      return False, None
+
+    self.entries.move_to_end(api_key)
+    return True, role
+
+  def put(self, api_key: str, role: Role | None):
+    self.entries[api_key] = (role, time.monotonic() + settings.ROLE_CACHE_TTL)
+    self.entries.move_to_end(api_key)
+    while len(self.entries) > settings.ROLE_CACHE_SIZE:
+      self.entries.popitem(last=False)
+
+  def invalidate(self, api_key: str):
+    self.entries.pop(api_key, None)
+    self.pending.pop(api_key, None)
+
+  def stats(self):
+    return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+role_cache = app_local("role_cache", RoleCache)
+
+
+async def fetch_user_role(api_key: str):
+  user = await collection_users.find_one({"api_key": api_key}, {"role": 1})
 
   if not user:
     return None
 
   role = user.get("role")
 
-  if role in [r.value for r in Role]:
+  if role in ROLE_VALUES:
     return Role(role)
 
   return None
+
+
+async def verify_user_role(api_key: str):
+  await role_cache.refresh()
+  found, role = role_cache.get(api_key)
+  if found:
+    role_cache.hits += 1
+    return role
+
+  role_cache.misses += 1
+
+  pending = role_cache.pending.get(api_key)
+  if pending:
+    try:
+      return await asyncio.shield(pending)
+    except LookupAbandoned:
+      return await verify_user_role(api_key)
+
+  future = asyncio.get_running_loop().create_future()
+  role_cache.pending[api_key] = future
+
+  try:
+    role = await fetch_user_role(api_key)
+  except Exception as e:
+    future.set_exception(e)
+    future.exception()
+    raise
+  except BaseException:
+    future.set_exception(LookupAbandoned())
+    future.exception()
+    raise
+  else:
+    future.set_result(role)
+    if role_cache.pending.get(api_key) is future:
+      role_cache.put(api_key, role)
+    return role
+  finally:
+    if role_cache.pending.get(api_key) is future:
+      del role_cache.pending[api_key]
@@ -0,0 +1,56 @@
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+
+
+def to_epoch_seconds(values) -> np.ndarray:
+  return np.array(values, dtype="datetime64[s]").astype(np.int64)
+
+
+def off_hours(window_start: int, window_end: int, day_start: int, day_end: int):
+  days = np.arange(window_start - window_start % SECONDS_PER_DAY, window_end, SECONDS_PER_DAY, dtype=np.int64)
+  starts, ends = [], []
+
+  if day_start > 0:
+    starts.append(days)
+    ends.append(days + day_start)
+  if day_end < SECONDS_PER_DAY:
+    starts.append(days + day_end)
+    ends.append(days + SECONDS_PER_DAY)
+
+  if not starts:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+  return np.concatenate(starts), np.concatenate(ends)
+
+
+def find_gaps(room_ids: np.ndarray, starts: np.ndarray, ends: np.ndarray, room_count: int, window_start: int,
+              window_end: int, min_duration: int):
+  span = window_end - window_start + 1
+  starts = np.clip(starts, window_start, window_end) - window_start
+  ends = np.clip(ends, window_start, window_end) - window_start
+
+  order = np.lexsort((starts, room_ids))
+  room_ids, starts, ends = room_ids[order], starts[order], ends[order]
+
+  # Shifting each room into its own band keeps one running maximum from leaking into the next room
+  offsets = room_ids * span
+  reach = np.maximum.accumulate(ends + offsets) - offsets if len(ends) else ends
+
+  first = np.ones(len(room_ids), dtype=bool)
+  first[1:] = room_ids[1:] != room_ids[:-1]
+  last = np.ones(len(room_ids), dtype=bool)
+  last[:-1] = first[1:]
+
+  previous = np.concatenate(([0], reach[:-1]))[:len(reach)]
+  previous[first] = 0
+  tail = np.zeros(room_count, dtype=np.int64)
+  tail[room_ids[last]] = reach[last]
+
+  gap_rooms = np.concatenate((room_ids, np.arange(room_count)))
+  gap_starts = np.concatenate((previous, tail))
+  gap_ends = np.concatenate((starts, np.full(room_count, span - 1)))
+
+  mask = gap_ends - gap_starts >= min_duration
+  gap_rooms, gap_starts, gap_ends = gap_rooms[mask], gap_starts[mask], gap_ends[mask]
+  order = np.lexsort((gap_starts, gap_rooms))
+  return gap_rooms[order], gap_starts[order] + window_start, gap_ends[order] + window_start
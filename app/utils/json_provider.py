@@ -0,0 +1,64 @@
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from pydantic_core import to_jsonable_python
+from quart.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+from app.config.settings import settings
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+# JSON_DATETIME_FORMAT picks the wire format for datetimes. "rfc822" keeps Quart's default
+# ("Tue, 01 Jan 2030 08:00:00 GMT"); "iso8601" sends "2030-01-01T08:00:00Z".
+# Motor returns naive datetimes, which are UTC, in both formats.
+DATETIME_OPTIONS = {
+  "rfc822": orjson.OPT_PASSTHROUGH_DATETIME,
+  "iso8601": orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z,
+}
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+# Same output as werkzeug's http_date. Bookings sit on a coarse time grid, so most values repeat in a dump.
+@lru_cache(maxsize=65536)
+def rfc822(value: datetime) -> str:
+  if value.utcoffset():
+    value = value.astimezone(timezone.utc)
+  return (f"{WEEKDAYS[value.weekday()]}, {value.day:02d} {MONTHS[value.month - 1]} {value.year:04d} "
+          f"{value.hour:02d}:{value.minute:02d}:{value.second:02d} GMT")
+
+
+def default(value: Any) -> Any:
+  if isinstance(value, ObjectId):
+    return str(value)
+  if isinstance(value, datetime):
+    return rfc822(value)
+  if isinstance(value, date):
+    return http_date(value)
+  return to_jsonable_python(value)
+
+
+def dumps_bytes(obj: Any, option: int = 0) -> bytes:
+  return orjson.dumps(obj, default=default,
+                      option=ORJSON_OPTIONS | DATETIME_OPTIONS[settings.JSON_DATETIME_FORMAT] | option)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+  def dumps(self, obj: Any, **kwargs: Any) -> str:
+    option = 0
+    if kwargs.get("indent"):
+      option |= orjson.OPT_INDENT_2
+    if kwargs.get("sort_keys"):
+      option |= orjson.OPT_SORT_KEYS
+    return dumps_bytes(obj, option).decode("utf-8")
+
+  def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+    return orjson.loads(s)
+
+  def response(self, *args: Any, **kwargs: Any):
+    obj = self._prepare_response_obj(args, kwargs)
+    return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,143 @@
+import time
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from pymongo import monitoring
+from quart import Quart, Response, request, g, has_app_context
+
+registry = CollectorRegistry()
+
+REQUEST_LATENCY = Histogram(
+  "http_request_duration_seconds", "HTTP request latency", ["blueprint", "route", "method"], registry=registry)
+RESPONSES = Counter(
+  "http_responses_total", "HTTP responses by status code", ["blueprint", "route", "method", "status"],
+  registry=registry)
+WEBSOCKET_CONNECTIONS = Gauge(
+  "websocket_connections", "Open WebSocket connections in active_connections_st", registry=registry)
+MONGO_COMMAND_LATENCY = Histogram(
+  "mongodb_command_duration_seconds", "MongoDB command latency", ["collection", "command", "outcome"],
+  buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5), registry=registry)
+MONGO_CHECKOUT_WAIT = Histogram(
+  "mongodb_pool_checkout_wait_seconds", "Time spent waiting for a pooled MongoDB connection",
+  buckets=(.0001, .0005, .001, .005, .01, .05, .1, .5, 1), registry=registry)
+
+
+class CommandTimingListener(monitoring.CommandListener):
+  def __init__(self):
+    self.collections = {}
+
+  def started(self, event):
+    collection = event.command.get(event.command_name)
+    self.collections[(event.connection_id, event.request_id)] = (
+      collection if isinstance(collection, str) else "")
+
+  def finish(self, event, outcome: str):
+    collection = self.collections.pop((event.connection_id, event.request_id), "")
+    MONGO_COMMAND_LATENCY.labels(collection, event.command_name, outcome).observe(event.duration_micros / 1e6)
+
+  def succeeded(self, event):
+    self.finish(event, "success")
+
+  def failed(self, event):
+    self.finish(event, "failure")
+
+
+class PoolCheckoutListener(monitoring.ConnectionPoolListener):
+  def connection_checked_out(self, event):
+    MONGO_CHECKOUT_WAIT.observe(event.duration)
+
+  def pool_created(self, event):
+    pass
+
+  def pool_ready(self, event):
+    pass
+
+  def pool_cleared(self, event):
+    pass
+
+  def pool_closed(self, event):
+    pass
+
+  def connection_created(self, event):
+    pass
+
+  def connection_ready(self, event):
+    pass
+
+  def connection_closed(self, event):
+    pass
+
+  def connection_check_out_started(self, event):
+    pass
+
+  def connection_check_out_failed(self, event):
+    pass
+
+  def connection_checked_in(self, event):
+    pass
+
+
+mongo_listeners = [CommandTimingListener(), PoolCheckoutListener()]
+
+
+class AppStatsCollector:
+  # Reads the in-process counters of the app's singletons at scrape time.
+  def collect(self):
+    if not has_app_context():
+      return
+
+    from app.utils.check_role import role_cache
+    from app.utils.send_to_admin import active_connections_st, slack_notifier
+
+    roles = role_cache.stats()
+    yield CounterMetricFamily("role_cache_hits", "verify_user_role lookups served from the cache",
+                              value=roles["hits"])
+    yield CounterMetricFamily("role_cache_misses", "verify_user_role lookups that went to MongoDB",
+                              value=roles["misses"])
+    yield GaugeMetricFamily("role_cache_entries", "API keys held in the role cache", value=roles["size"])
+
+    broadcast = active_connections_st.stats()
+    yield CounterMetricFamily("broadcast_dropped_messages", "Admin broadcasts dropped because a queue was full",
+                              value=broadcast["dropped"])
+    yield CounterMetricFamily("broadcast_disconnects", "Admin WebSockets closed for falling behind",
+                              value=broadcast["disconnected"])
+    lag = GaugeMetricFamily("broadcast_lag_seconds", "Age of the oldest undelivered broadcast per admin WebSocket",
+                            labels=["connection"])
+    for connection, seconds in broadcast["lag"].items():
+      lag.add_metric([connection], seconds)
+    yield lag
+
+    slack = slack_notifier.stats()
+    yield GaugeMetricFamily("slack_queue_depth", "Slack messages waiting to be sent", value=slack["queue_depth"])
+    messages = CounterMetricFamily("slack_messages", "Slack messages by outcome", labels=["outcome"])
+    for outcome in ("sent", "failed", "dropped"):
+      messages.add_metric([outcome], slack[outcome])
+    yield messages
+    yield CounterMetricFamily("slack_retries", "Slack delivery attempts retried after a failure",
+                              value=slack["retries"])
+
+
+registry.register(AppStatsCollector())
+
+
+def init_metrics(app: Quart):
+  from app.utils.send_to_admin import active_connections_st
+
+  WEBSOCKET_CONNECTIONS.set_function(lambda: len(active_connections_st))
+
+  @app.before_request
+  async def start_timer():
+    g.request_started = time.perf_counter()
+
+  @app.after_request
+  async def record_request(response):
+    started = g.get("request_started")
+    if started is not None and request.url_rule is not None:
+      labels = (request.blueprint or "", request.url_rule.rule, request.method)
+      REQUEST_LATENCY.labels(*labels).observe(time.perf_counter() - started)
+      RESPONSES.labels(*labels, str(response.status_code)).inc()
+    return response
+
+  @app.route("/metrics", methods=["GET"])
+  async def metrics():
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
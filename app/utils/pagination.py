@@ -0,0 +1,23 @@
+import base64
+
+MAX_PAGE_SIZE = 500
+DEFAULT_PAGE_SIZE = 100
+
+
+def encode_cursor(*parts: str) -> str:
+  raw = "|".join(parts).encode("utf-8")
+  return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[str] | None:
+  try:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|")
+  except Exception:
+    return None
+
+
+def page_size(limit: int | None) -> int:
+  if not limit or limit < 1:
+    return DEFAULT_PAGE_SIZE
+  return min(limit, MAX_PAGE_SIZE)
@@ -0,0 +1,86 @@
+import cProfile
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from quart import Quart, request, g
+
+from app.config.settings import settings
+from app.models.users import Role
+from app.utils.app_state import app_local
+from app.utils.check_role import verify_user_role
+
+PROFILE_HEADER = "X-Profile"
+PROFILER_ROLES = {Role.ADMIN, Role.SUPERADMIN}
+
+
+class RequestProfiler:
+  def __init__(self):
+    self.active = False
+
+  async def wanted(self) -> bool:
+    if self.active:
+      return False
+    if settings.PROFILE_REQUESTS:
+      return True
+    if PROFILE_HEADER not in request.headers:
+      return False
+    return await verify_user_role(request.headers.get("X-API-Key", "")) in PROFILER_ROLES
+
+  def start(self):
+    self.active = True
+    profile = cProfile.Profile()
+    profile.enable()
+    return profile, time.perf_counter()
+
+  def stop(self, profile: cProfile.Profile, started: float, route: str) -> str:
+    try:
+      profile.disable()
+      elapsed_ms = (time.perf_counter() - started) * 1000
+
+      directory = Path(settings.PROFILE_DIR)
+      directory.mkdir(parents=True, exist_ok=True)
+      safe_route = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+      path = directory / f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{safe_route}-{elapsed_ms:.0f}ms.prof"
+      profile.dump_stats(path)
+      self.rotate(directory)
+      return path.name
+    finally:
+      self.active = False
+
+  def discard(self, profile: cProfile.Profile):
+    try:
+      profile.disable()
+    finally:
+      self.active = False
+
+  def rotate(self, directory: Path):
+    profiles = sorted(directory.glob("*.prof"), key=lambda file: file.stat().st_mtime)
+    for stale in profiles[:-settings.PROFILE_MAX_FILES]:
+      stale.unlink(missing_ok=True)
+
+
+request_profiler = app_local("request_profiler", RequestProfiler)
+
+
+def init_profiling(app: Quart):
+  @app.before_request
+  async def start_profile():
+    if await request_profiler.wanted():
+      g.request_profile = request_profiler.start()
+
+  @app.after_request
+  async def stop_profile(response):
+    profile = g.pop("request_profile", None)
+    if profile:
+      route = request.url_rule.rule if request.url_rule else request.path
+      response.headers["X-Profile-File"] = request_profiler.stop(*profile, route)
+    return response
+
+  @app.teardown_request
+  async def discard_profile(exc):
+    # after_request is skipped when the request is cancelled or another after hook raises
+    profile = g.pop("request_profile", None)
+    if profile:
+      request_profiler.discard(profile[0])
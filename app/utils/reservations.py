@@ -0,0 +1,62 @@
+import asyncio
+
+from pymongo.errors import DuplicateKeyError
+
+from app.database.mongoDB import collection_schedules, collection_reservations
+from app.utils.room_index import to_naive_utc
+
+REBUILD_PIPELINE = [
+  {"$group": {
+    "_id": {"room_name": "$rooms.room_name", "day": {"$dateTrunc": {"date": "$start", "unit": "day"}}},
+    "intervals": {"$push": {"start": "$start", "end": "$end", "booking_id": "$_id"}},
+  }},
+  {"$project": {"_id": 0, "room_name": "$_id.room_name", "day": "$_id.day", "intervals": 1}},
+  {"$out": collection_reservations.name},
+]
+
+
+def reservation_key(room_name: str, start):
+  day = to_naive_utc(start).replace(hour=0, minute=0, second=0, microsecond=0)
+  return {"room_name": room_name, "day": day}
+
+
+async def reserve(room_name: str, start, end, booking_id) -> bool:
+  key = reservation_key(room_name, start)
+  conditional = {**key, "intervals": {"$not": {"$elemMatch": {"start": {"$lt": end}, "end": {"$gt": start}}}}}
+  interval = {"$push": {"intervals": {"start": start, "end": end, "booking_id": booking_id}}}
+
+  result = await collection_reservations.update_one(conditional, interval)
+  if result.modified_count:
+    return True
+
+  try:
+    await collection_reservations.update_one(key, {"$setOnInsert": {"intervals": []}}, upsert=True)
+  except DuplicateKeyError:
+    pass
+
+  result = await collection_reservations.update_one(conditional, interval)
+  return bool(result.modified_count)
+
+
+async def reserve_many(room_name: str, slots: list[tuple]) -> list[bool]:
+  return list(await asyncio.gather(*(reserve(room_name, start, end, booking_id)
+                                     for start, end, booking_id in slots)))
+
+
+async def release(room_name: str, start, booking_id):
+  await collection_reservations.update_one(reservation_key(room_name, start),
+                                           {"$pull": {"intervals": {"booking_id": booking_id}}})
+
+
+async def rebuild_reservations():
+  await collection_schedules.aggregate(REBUILD_PIPELINE).to_list(length=None)
+
+
+async def ensure_reservations():
+  if await collection_reservations.estimated_document_count() == 0:
+    await rebuild_reservations()
+
+
+if __name__ == "__main__":
+  from app.main import run_in_app
+  asyncio.run(run_in_app(rebuild_reservations))
@@ -0,0 +1,88 @@
+import hashlib
+import time
+from functools import wraps
+
+from quart import request, make_response, Response
+
+from app.config.settings import settings
+from app.utils.app_state import app_local
+from app.utils.shared_generation import SharedGeneration
+
+
+class CachedResponse:
+  __slots__ = ("generation", "created_at", "body", "mimetype", "etag")
+
+  def __init__(self, generation: int, body: bytes, mimetype: str):
+    self.generation = generation
+    self.created_at = time.monotonic()
+    self.body = body
+    self.mimetype = mimetype
+    self.etag = f"{generation}-{hashlib.sha1(body).hexdigest()[:16]}"
+
+
+class ResponseCache:
+  def __init__(self, max_entries: int = 256):
+    self.max_entries = max_entries
+    # Shared through Mongo so a write on one worker invalidates every worker's cache;
+    # other workers notice within RESPONSE_CACHE_CHECK_INTERVAL.
+    self.shared = SharedGeneration("response_cache")
+    self.entries = {}
+
+  @property
+  def generation(self) -> int:
+    return self.shared.value
+
+  async def bump(self):
+    self.entries.clear()
+    await self.shared.bump()
+
+  async def refresh(self):
+    if await self.shared.changed(settings.RESPONSE_CACHE_CHECK_INTERVAL):
+      self.entries.clear()
+
+  def get(self, key):
+    entry = self.entries.get(key)
+    if entry is None:
+      return None
+    if entry.generation != self.generation or time.monotonic() - entry.created_at > settings.RESPONSE_CACHE_TTL:
+      del self.entries[key]
+      return None
+    return entry
+
+  def put(self, key, body: bytes, mimetype: str):
+    if len(self.entries) >= self.max_entries:
+      self.entries.pop(next(iter(self.entries)))
+    entry = CachedResponse(self.generation, body, mimetype)
+    self.entries[key] = entry
+    return entry
+
+
+response_cache = app_local("response_cache", ResponseCache)
+
+
+def cached_response(view):
+  @wraps(view)
+  async def wrapper(*args, **kwargs):
+    if request.args.get("format") == "ndjson":
+      return await view(*args, **kwargs)
+
+    key = (request.path, tuple(sorted(request.args.items(multi=True))))
+    await response_cache.refresh()
+    entry = response_cache.get(key)
+
+    if entry is None:
+      generation = response_cache.generation
+      response = await make_response(await view(*args, **kwargs))
+      if response.status_code != 200 or generation != response_cache.generation:
+        return response
+      entry = response_cache.put(key, await response.get_data(), response.mimetype)
+
+    if request.if_none_match.contains(entry.etag):
+      response = Response(b"", status=304)
+    else:
+      response = Response(entry.body, mimetype=entry.mimetype)
+
+    response.set_etag(entry.etag)
+    return response
+
+  return wrapper
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from enum import Enum
+
+from pymongo import UpdateOne
+
+from app.database.mongoDB import collection_schedules, collection_rollups
+from app.models.codec import coerce_enum
+from app.models.schedule import ActivityType
+from app.utils.archive import booking_archiver, archive_collection
+from app.utils.room_index import to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+REBUILD_PIPELINE = [
+  {"$group": {
+    "_id": {"room_name": "$rooms.room_name",
+            "day": {"$dateTrunc": {"date": "$start", "unit": "day"}},
+            "activity": {"$cond": [{"$in": ["$activity", [activity.value for activity in ActivityType]]},
+                                   "$activity", ActivityType.OTHER.value]}},
+    "room_type": {"$first": "$rooms.room_type"},
+    "minutes": {"$sum": {"$dateDiff": {"startDate": "$start", "endDate": "$end", "unit": "minute"}}},
+    "count": {"$sum": 1},
+    "peak": {"$max": "$requested_capacity"},
+  }},
+  {"$group": {
+    "_id": {"room_name": "$_id.room_name", "day": "$_id.day"},
+    "room_type": {"$first": "$room_type"},
+    "booked_minutes": {"$sum": "$minutes"},
+    "booking_count": {"$sum": "$count"},
+    "peak_requested_capacity": {"$max": "$peak"},
+    "activities": {"$push": {"k": "$_id.activity", "v": {"minutes": "$minutes", "count": "$count"}}},
+  }},
+  {"$project": {
+    "_id": 0,
+    "room_name": "$_id.room_name",
+    "day": "$_id.day",
+    "room_type": 1,
+    "booked_minutes": 1,
+    "booking_count": 1,
+    "peak_requested_capacity": 1,
+    "activities": {"$arrayToObject": "$activities"},
+  }},
+  {"$out": collection_rollups.name},
+]
+
+
+def enum_value(value):
+  return value.value if isinstance(value, Enum) else value
+
+
+def activity_key(value) -> str:
+  try:
+    return coerce_enum(ActivityType, enum_value(value)).value
+  except ValueError:
+    return ActivityType.OTHER.value
+
+
+def rollup_update(schedule: dict, sign: int):
+  start, end = to_naive_utc(schedule["start"]), to_naive_utc(schedule["end"])
+  minutes = int((end - start).total_seconds() // 60) * sign
+  activity = activity_key(schedule.get("activity"))
+  rooms = schedule["rooms"]
+
+  update = {
+    "$inc": {
+      "booked_minutes": minutes,
+      "booking_count": sign,
+      f"activities.{activity}.minutes": minutes,
+      f"activities.{activity}.count": sign,
+    },
+    "$set": {"room_type": enum_value(rooms.get("room_type"))},
+  }
+  requested = schedule.get("requested_capacity")
+  if sign > 0 and requested:
+    update["$max"] = {"peak_requested_capacity": requested}
+
+  day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+  return UpdateOne({"room_name": enum_value(rooms.get("room_name")), "day": day}, update, upsert=True)
+
+
+async def record_bookings(schedules: list[dict], sign: int = 1):
+  if not schedules:
+    return
+  try:
+    await collection_rollups.bulk_write([rollup_update(schedule, sign) for schedule in schedules], ordered=False)
+  except Exception:
+    logger.exception("Updating room usage rollups failed; run python -m app.utils.rollups to rebuild them")
+
+
+async def rebuild_rollups():
+  await booking_archiver.load()
+  archives = [{"$unionWith": archive_collection(term).name} for term in sorted(booking_archiver.terms)]
+  await collection_schedules.aggregate(archives + REBUILD_PIPELINE).to_list(length=None)
+
+
+if __name__ == "__main__":
+  from app.main import run_in_app
+  asyncio.run(run_in_app(rebuild_rollups))
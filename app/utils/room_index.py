@@ -0,0 +1,111 @@
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import accumulate
+
+import pytz
+
+from app.config.settings import settings
+from app.database.mongoDB import collection_schedules
+from app.utils.app_state import app_local
+
+
+def to_naive_utc(value: datetime) -> datetime:
+  if value.tzinfo is not None:
+    return value.astimezone(pytz.UTC).replace(tzinfo=None)
+  return value
+
+
+class RoomIntervalIndex:
+  def __init__(self):
+    self.rooms = {}
+    self.reach = {}
+    self.loaded_at = {}
+    self.full_loaded_at = None
+
+  def is_stale(self, room_name: str) -> bool:
+    loaded_at = self.loaded_at.get(room_name, self.full_loaded_at)
+    return loaded_at is None or time.monotonic() - loaded_at > settings.ROOM_INDEX_MAX_AGE
+
+  async def load(self):
+    rooms = {}
+    cursor = collection_schedules.find({}, {"rooms.room_name": 1, "start": 1, "end": 1})
+
+    async for schedule in cursor:
+      room_name = schedule.get("rooms", {}).get("room_name")
+      if not room_name:
+        continue
+      rooms.setdefault(room_name, []).append(
+        (to_naive_utc(schedule["start"]), to_naive_utc(schedule["end"]), str(schedule["_id"])))
+
+    self.rooms = {name: sorted(intervals) for name, intervals in rooms.items()}
+    self.reach = {name: self.build_reach(intervals) for name, intervals in self.rooms.items()}
+    self.loaded_at = {}
+    self.full_loaded_at = time.monotonic()
+
+  async def refresh_room(self, room_name: str):
+    cursor = collection_schedules.find({"rooms.room_name": room_name}, {"start": 1, "end": 1})
+    intervals = [(to_naive_utc(schedule["start"]), to_naive_utc(schedule["end"]), str(schedule["_id"]))
+                 async for schedule in cursor]
+
+    self.rooms[room_name] = sorted(intervals)
+    self.reach[room_name] = self.build_reach(self.rooms[room_name])
+    self.loaded_at[room_name] = time.monotonic()
+
+  @staticmethod
+  def build_reach(intervals: list) -> list:
+    return list(accumulate((interval[1] for interval in intervals), max))
+
+  def add(self, room_name: str, start: datetime, end: datetime, schedule_id):
+    interval = (to_naive_utc(start), to_naive_utc(end), str(schedule_id))
+    intervals = self.rooms.setdefault(room_name, [])
+    reach = self.reach.setdefault(room_name, [])
+    position = bisect_right(intervals, interval)
+    intervals.insert(position, interval)
+
+    end = interval[1]
+    reach.insert(position, max(reach[position - 1], end) if position else end)
+    # Later prefixes only change until one already reaches past the new end.
+    for later in range(position + 1, len(reach)):
+      if reach[later] >= end:
+        break
+      reach[later] = end
+
+  def remove(self, room_name: str, start: datetime, end: datetime):
+    intervals = self.rooms.get(room_name)
+    if not intervals:
+      return
+
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    position = bisect_left(intervals, (start,))
+    while position < len(intervals) and intervals[position][0] == start:
+      if intervals[position][1] == end:
+        del intervals[position]
+        self.shrink_reach(room_name, position)
+        return
+      position += 1
+
+  def shrink_reach(self, room_name: str, position: int):
+    intervals, reach = self.rooms[room_name], self.reach[room_name]
+    del reach[position]
+    previous = reach[position - 1] if position else None
+    for later in range(position, len(reach)):
+      value = intervals[later][1] if previous is None else max(previous, intervals[later][1])
+      if reach[later] == value:
+        break
+      reach[later] = previous = value
+
+  def overlaps(self, room_name: str, start: datetime, end: datetime) -> bool:
+    intervals = self.rooms.get(room_name)
+    if not intervals:
+      return False
+
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    position = bisect_left(intervals, (end,))
+    if position == 0:
+      return False
+
+    return self.reach[room_name][position - 1] > start
+
+
+room_index = app_local("room_index", RoomIntervalIndex)
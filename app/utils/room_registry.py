@@ -0,0 +1,103 @@
+import asyncio
+import re
+import time
+from types import MappingProxyType
+from typing import NamedTuple
+
+from app.config.settings import settings
+from app.database.mongoDB import collection_rooms
+from app.models.schedule import RoomType
+from app.utils.app_state import app_local
+
+SPELLING_SEPARATORS = re.compile(r"[\s_\-]+")
+
+DEFAULT_ROOMS = (
+  ("ADA_LOVELACE", "Ada Lovelace", RoomType.CLASSROOMS, 70),
+  ("ALAN_TURING", "Alan Turing", RoomType.CLASSROOMS, 24),
+  ("CLAUDE_SHANNON", "Claude Shannon", RoomType.CLASSROOMS, 32),
+  ("DONALD_KNUTH", "Donald Knuth", RoomType.CLASSROOMS, 24),
+  ("LIBRARY", "Library", RoomType.CLASSROOMS, 30),
+  ("WILLIAM_SHOCKLEY", "William Shockley", RoomType.CLASSROOMS, 20),
+  ("DARTH_VADER", "Darth Vader", RoomType.MEETING_ROOMS, 9),
+  ("SIRIUS", "Sirius", RoomType.MEETING_ROOMS, 6),
+  ("PROXIMA", "Proxima", RoomType.MEETING_ROOMS, 3),
+  ("RECORDING_ROOM", "Recording Room", RoomType.OTHERS, 2),
+  ("CALL_ROOM_N2", "Call Room N2", RoomType.OTHERS, 2),
+)
+
+
+class RoomInfo(NamedTuple):
+  id: str
+  name: str
+  room_type: RoomType
+  capacity: int
+
+
+def normalize_spelling(spelling: str) -> str:
+  return SPELLING_SEPARATORS.sub(" ", spelling.strip()).casefold()
+
+
+def room_document(room_id: str, name: str, room_type, capacity: int, aliases=()) -> dict:
+  return {"_id": room_id, "name": name, "room_type": RoomType(room_type).value, "capacity": int(capacity),
+          "aliases": list(aliases)}
+
+
+class RoomRegistry:
+  def __init__(self):
+    self.rooms = ()
+    self.spellings = MappingProxyType({})
+    self.loaded_at = None
+    self.reloading = None
+
+  def is_stale(self) -> bool:
+    return self.loaded_at is None or time.monotonic() - self.loaded_at > settings.ROOM_REGISTRY_MAX_AGE
+
+  async def seed(self):
+    if await collection_rooms.count_documents({}, limit=1):
+      return
+    await collection_rooms.insert_many([room_document(*room) for room in DEFAULT_ROOMS])
+
+  async def load(self):
+    rooms, spellings = [], {}
+    async for document in collection_rooms.find({}).sort("_id", 1):
+      room = RoomInfo(document["_id"], document["name"], RoomType(document["room_type"]), document["capacity"])
+      rooms.append(room)
+      for spelling in (room.id, room.name, *document.get("aliases", ())):
+        spellings.setdefault(spelling, room)
+        spellings.setdefault(normalize_spelling(spelling), room)
+
+    # Readers hold on to whichever snapshot they looked up, so a reload never blocks or tears them.
+    self.rooms, self.spellings = tuple(rooms), MappingProxyType(spellings)
+    self.loaded_at = time.monotonic()
+
+  def refresh_in_background(self):
+    if not self.is_stale() or (self.reloading is not None and not self.reloading.done()):
+      return
+    try:
+      loop = asyncio.get_running_loop()
+    except RuntimeError:
+      # Resolved outside the event loop (scripts, validators); serve the current snapshot.
+      return
+    self.reloading = loop.create_task(self.load())
+
+  def resolve(self, spelling) -> RoomInfo | None:
+    if not isinstance(spelling, str):
+      return None
+    if self.loaded_at is not None:
+      self.refresh_in_background()
+    spellings = self.spellings
+    return spellings.get(spelling) or spellings.get(normalize_spelling(spelling))
+
+  async def save(self, room_id: str, name: str, room_type, capacity: int, aliases=()):
+    document = room_document(room_id, name, room_type, capacity, aliases)
+    await collection_rooms.replace_one({"_id": room_id}, document, upsert=True)
+    await self.load()
+    return self.resolve(room_id)
+
+  async def delete(self, room_id: str) -> bool:
+    result = await collection_rooms.delete_one({"_id": room_id})
+    await self.load()
+    return bool(result.deleted_count)
+
+
+room_registry = app_local("room_registry", RoomRegistry)
@@ -1,43 +1,242 @@
-from quart import websocket
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import aiohttp
 
 from app.config.settings import settings
+from app.utils.app_state import app_local
 
-active_connections_st = set()
+SLACK_CHANNEL = "#classroom-notifications"
+SLACK_API_URL = "https://slack.com/api/chat.postMessage"
 
-import aiohttp
+logger = logging.getLogger(__name__)
 
-SLACK_CHANNEL = "#classroom-notifications"
+
+def retry_after_seconds(value: str | None, default: float) -> float:
+  if not value:
+    return default
+  try:
+    return max(0.0, float(value))
+  except ValueError:
+    pass
+  try:
+    retry_at = parsedate_to_datetime(value)
+  except (TypeError, ValueError):
+    return default
+  if retry_at.tzinfo is None:
+    retry_at = retry_at.replace(tzinfo=timezone.utc)
+  return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class OutboundConnection:
+  def __init__(self, conn, max_queue: int):
+    self.conn = conn
+    self.queue = asyncio.Queue(maxsize=max_queue)
+    self.enqueued_at = deque()
+    self.writer = None
+    self.dropped = 0
+    self.last_lag = 0.0
+
+  def put(self, message: str, enqueued_at: float):
+    self.queue.put_nowait(message)
+    self.enqueued_at.append(enqueued_at)
+
+  def lag(self) -> float:
+    if not self.enqueued_at:
+      return self.last_lag
+    return time.monotonic() - self.enqueued_at[0]
+
+  async def write(self, on_error):
+    while True:
+      message = await self.queue.get()
+      enqueued_at = self.enqueued_at.popleft()
+      try:
+        await self.conn.send(message)
+      except Exception:
+        on_error(self.conn)
+        return
+      self.last_lag = time.monotonic() - enqueued_at
+
+
+class ConnectionRegistry:
+  def __init__(self):
+    self.connections = {}
+    self.dropped = 0
+    self.disconnected = 0
+    self.closing = set()
+
+  def __len__(self):
+    return len(self.connections)
+
+  def __iter__(self):
+    return iter(list(self.connections))
+
+  def add(self, conn):
+    outbound = OutboundConnection(conn, settings.BROADCAST_QUEUE_SIZE)
+    outbound.writer = asyncio.create_task(outbound.write(self.remove))
+    self.connections[conn] = outbound
+
+  def remove(self, conn):
+    outbound = self.connections.pop(conn, None)
+    if outbound and outbound.writer is not asyncio.current_task():
+      outbound.writer.cancel()
+
+  def publish(self, message: str):
+    enqueued_at = time.monotonic()
+    for conn, outbound in list(self.connections.items()):
+      try:
+        outbound.put(message, enqueued_at)
+      except asyncio.QueueFull:
+        outbound.dropped += 1
+        self.dropped += 1
+        if settings.BROADCAST_SLOW_POLICY == "disconnect":
+          self.disconnected += 1
+          self.remove(conn)
+          self.close(conn)
+
+  def close(self, conn):
+    task = asyncio.create_task(conn.close(1013))
+    self.closing.add(task)
+    task.add_done_callback(self.closed)
+
+  def closed(self, task: asyncio.Task):
+    self.closing.discard(task)
+    if not task.cancelled():
+      task.exception()
+
+  def stats(self):
+    return {
+      "connections": len(self.connections),
+      "dropped": self.dropped,
+      "disconnected": self.disconnected,
+      "lag": {str(id(conn)): outbound.lag() for conn, outbound in self.connections.items()},
+    }
+
+
+active_connections_st = app_local("active_connections_st", ConnectionRegistry)
 
 
 async def broadcast_to_admins(message: str):
-  for conn in list(active_connections_st):
+  active_connections_st.publish(message)
+
+
+class SlackNotifier:
+  def __init__(self, token: str | None = None, url: str = SLACK_API_URL, channel: str = SLACK_CHANNEL,
+               max_queue: int = 1000, batch_size: int = 20, max_retries: int = 5, retry_delay: float = 1.0,
+               timeout: float = 10.0):
+    self.token = token
+    self.url = url
+    self.channel = channel
+    self.batch_size = batch_size
+    self.max_retries = max_retries
+    self.retry_delay = retry_delay
+    self.timeout = timeout
+    self.queue = asyncio.Queue(maxsize=max_queue)
+    self.session = None
+    self.worker = None
+    self.sent = 0
+    self.failed = 0
+    self.dropped = 0
+    self.retries = 0
+    self.last_latency = None
+    self.last_error = None
+
+  def enqueue(self, text: str) -> bool:
     try:
-      await conn.send(message)
-    except Exception:
-      active_connections_st.remove(conn)
+      self.queue.put_nowait((text, time.monotonic()))
+      return True
+    except asyncio.QueueFull:
+      self.dropped += 1
+      return False
 
+  async def start(self):
+    if self.worker:
+      return
+    self.session = aiohttp.ClientSession(headers={"Authorization": f"Bearer {self.token or settings.SLACK_BOT_KEY}"},
+                                         timeout=aiohttp.ClientTimeout(total=self.timeout))
+    self.worker = asyncio.create_task(self.run())
 
-async def send_slack_message(text: str):
-  url = "https://slack.com/api/chat.postMessage"
-  headers = {"Authorization": f"Bearer {settings.SLACK_BOT_KEY}", "Content-Type": "application/json"}
-  payload = {"channel": SLACK_CHANNEL, "text": text}
+  async def stop(self):
+    if self.worker:
+      self.worker.cancel()
+      try:
+        await self.worker
+      except asyncio.CancelledError:
+        pass
+      self.worker = None
+    if self.session:
+      await self.session.close()
+      self.session = None
 
-  try:
-    async with aiohttp.ClientSession() as session:
-      async with session.post(url, headers=headers, json=payload) as resp:
-        status = resp.status
-        response_data = await resp.json()
+  async def run(self):
+    while True:
+      batch = [await self.queue.get()]
+      while len(batch) < self.batch_size and not self.queue.empty():
+        batch.append(self.queue.get_nowait())
+
+      try:
+        delivered = await self.deliver("\n\n".join(text for text, _ in batch))
+      except Exception as e:
+        logger.exception("Slack delivery failed")
+        self.last_error = str(e)
+        delivered = False
+      finally:
+        for _ in batch:
+          self.queue.task_done()
+
+      if delivered:
+        self.sent += len(batch)
+        self.last_latency = time.monotonic() - min(enqueued_at for _, enqueued_at in batch)
+      else:
+        self.failed += len(batch)
+
+  async def deliver(self, text: str) -> bool:
+    payload = {"channel": self.channel, "text": text}
+
+    for attempt in range(self.max_retries):
+      backoff = self.retry_delay * 2 ** attempt
+      if attempt:
+        self.retries += 1
+      try:
+        async with self.session.post(self.url, json=payload) as resp:
+          if resp.status == 429:
+            await asyncio.sleep(retry_after_seconds(resp.headers.get("Retry-After"), backoff))
+            continue
+
+          if resp.status != 200:
+            self.last_error = f"HTTP {resp.status}"
+            await asyncio.sleep(backoff)
+            continue
+
+          response_data = await resp.json()
+          if not response_data.get("ok"):
+            self.last_error = response_data.get("error", "not ok")
+          return bool(response_data.get("ok"))
+
+      except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        self.last_error = str(e) or type(e).__name__
+        await asyncio.sleep(backoff)
+
+    return False
+
+  def stats(self):
+    return {
+      "queue_depth": self.queue.qsize(),
+      "sent": self.sent,
+      "failed": self.failed,
+      "dropped": self.dropped,
+      "retries": self.retries,
+      "last_latency": self.last_latency,
+      "last_error": self.last_error,
+    }
 
-        if status != 200:
-          await websocket.send_json({"success": False, "error": f"HTTP {status}"})
 
-        if not response_data.get("ok"):
-          error_message = response_data.get("error", "Unknown error")
-          await websocket.send_json({"success": False, "error": error_message})
+slack_notifier = app_local("slack_notifier", SlackNotifier)
 
-        await websocket.send_json({"success": True, "response": response_data})
 
-  except aiohttp.ClientError as e:
-    await websocket.send_json({"success": False, "error": "Request failed"})
-  except Exception as e:
-    await websocket.send_json({"success": False, "error": "Unexpected error"})
+def send_slack_message(text: str) -> bool:
+  return slack_notifier.enqueue(text)
@@ -0,0 +1,44 @@
+import logging
+import time
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from app.database.mongoDB import collection_counters
+
+logger = logging.getLogger(__name__)
+
+
+class SharedGeneration:
+  def __init__(self, counter_id: str):
+    self.counter_id = counter_id
+    self.value = 0
+    self.checked_at = None
+
+  async def bump(self):
+    try:
+      counter = await collection_counters.find_one_and_update(
+        {"_id": self.counter_id}, {"$inc": {"seq": 1}}, upsert=True, return_document=ReturnDocument.AFTER)
+    except PyMongoError:
+      logger.exception("Publishing the %s generation failed", self.counter_id)
+      self.value += 1
+      return
+    self.value = counter["seq"]
+    self.checked_at = time.monotonic()
+
+  async def changed(self, interval: float) -> bool:
+    now = time.monotonic()
+    if self.checked_at is not None and now - self.checked_at < interval:
+      return False
+    self.checked_at = now
+    try:
+      counter = await collection_counters.find_one({"_id": self.counter_id})
+    except PyMongoError:
+      logger.exception("Reading the %s generation failed", self.counter_id)
+      return False
+
+    value = counter["seq"] if counter else 0
+    if value == self.value:
+      return False
+    self.value = value
+    return True
@@ -1 +1,30 @@
-storage = []
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError
+
+from app.database.mongoDB import collection_pending
+from app.utils.app_state import app_local
+
+
+class PendingBookingStore:
+  async def add(self, booking: dict) -> str:
+    document = {**booking, "created_at": datetime.utcnow()}
+    result = await collection_pending.insert_one(document)
+    return str(result.inserted_id)
+
+  async def pop(self, request_id: str):
+    try:
+      return await collection_pending.find_one_and_delete({"_id": ObjectId(request_id)})
+    except InvalidId:
+      return None
+
+  async def restore(self, document: dict):
+    try:
+      await collection_pending.insert_one(document)
+    except DuplicateKeyError:
+      pass
+
+
+storage = app_local("storage", PendingBookingStore)
@@ -0,0 +1,253 @@
+import asyncio
+import re
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+
+from app.config.settings import settings
+from app.database.mongoDB import collection_users
+from app.models.users import Role
+from app.utils.app_state import app_local
+
+SEARCH_FIELDS = ("name", "surname", "email", "phone_number", "group_name")
+SEARCH_PROJECTION = dict.fromkeys((*SEARCH_FIELDS, "created_at"), 1)
+TOKEN_SPLIT = re.compile(r"[\s@._/\-]+")
+NATIONAL_PHONE_DIGITS = 10
+MIN_FUZZY_LENGTH = 4
+MAX_CANDIDATES = 2000
+MAX_FUZZY_CHECKS = 200
+
+
+def normalize(value) -> str:
+  return str(value).casefold().strip()
+
+
+def document_tokens(student: dict) -> tuple[set[str], set[str]]:
+  tokens, words = set(), set()
+  for field in SEARCH_FIELDS:
+    value = student.get(field)
+    if not value:
+      continue
+    value = normalize(value)
+
+    if field == "phone_number":
+      digits = re.sub(r"\D", "", value)
+      tokens.update((digits, digits[-NATIONAL_PHONE_DIGITS:]))
+      continue
+
+    parts = [part for part in TOKEN_SPLIT.split(value) if part]
+    tokens.add(value)
+    tokens.update(parts)
+    words.update(part for part in parts if len(part) >= MIN_FUZZY_LENGTH and part.isalpha())
+
+  tokens.discard("")
+  return tokens, words
+
+
+def trigrams(token: str, whole: bool = True) -> set[str]:
+  padded = f"^{token}$" if whole else f"^{token}"
+  return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(term: str) -> int:
+  if len(term) < MIN_FUZZY_LENGTH or not term.isalpha():
+    return 0
+  return 1 if len(term) <= 8 else 2
+
+
+def fuzzy_prefix_match(term: str, token: str, limit: int) -> bool:
+  token = token[:len(term) + limit]
+  if len(token) < len(term) - limit:
+    return False
+
+  before, previous = None, list(range(len(token) + 1))
+  for i, term_char in enumerate(term, 1):
+    current = [i]
+    for j, token_char in enumerate(token, 1):
+      distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (term_char != token_char))
+      if before and j > 1 and term_char == token[j - 2] and term[i - 2] == token_char:
+        distance = min(distance, before[j - 2] + 1)
+      current.append(distance)
+    if min(current) > limit:
+      return False
+    before, previous = previous, current
+
+  return min(previous[max(0, len(term) - limit):]) <= limit
+
+
+class StudentSearchIndex:
+  def __init__(self):
+    self.students = {}
+    self.doc_tokens = {}
+    self.postings = {}
+    self.sorted_tokens = []
+    self.grams = {}
+    self.loaded_at = None
+    self.reloading = None
+    self.pending = None
+
+  def is_stale(self) -> bool:
+    return self.loaded_at is None or time.monotonic() - self.loaded_at > settings.STUDENT_SEARCH_MAX_AGE
+
+  async def load(self):
+    # Changes made while the snapshot is read are replayed onto it before the swap.
+    self.pending = []
+    try:
+      fresh = StudentSearchIndex()
+      async for student in collection_users.find({"role": Role.STUDENT.value}, SEARCH_PROJECTION):
+        fresh.add(student, keep_sorted=False)
+      fresh.sorted_tokens.sort()
+      for change, value in self.pending:
+        getattr(fresh, change)(value)
+    finally:
+      self.pending = None
+
+    self.students, self.doc_tokens = fresh.students, fresh.doc_tokens
+    self.postings, self.sorted_tokens, self.grams = fresh.postings, fresh.sorted_tokens, fresh.grams
+    self.loaded_at = time.monotonic()
+
+  def refresh_in_background(self):
+    if self.is_stale() and (self.reloading is None or self.reloading.done()):
+      self.reloading = asyncio.create_task(self.load())
+
+  def add(self, student: dict, keep_sorted: bool = True):
+    if self.pending is not None:
+      self.pending.append(("add", student))
+
+    student_id = str(student["_id"])
+    if student_id in self.students:
+      self.unindex(student_id)
+
+    self.students[student_id] = {"id": student_id, **{field: student[field] for field in SEARCH_PROJECTION
+                                                      if field in student}}
+    tokens, words = document_tokens(student)
+    self.doc_tokens[student_id] = tokens
+
+    for token in tokens:
+      owners = self.postings.get(token)
+      if owners is not None:
+        owners.add(student_id)
+        continue
+
+      self.postings[token] = {student_id}
+      if keep_sorted:
+        insort(self.sorted_tokens, token)
+      else:
+        self.sorted_tokens.append(token)
+      if token in words:
+        for gram in trigrams(token):
+          self.grams.setdefault(gram, set()).add(token)
+
+  def remove(self, student_id):
+    if self.pending is not None:
+      self.pending.append(("remove", student_id))
+    self.unindex(str(student_id))
+
+  def unindex(self, student_id: str):
+    self.students.pop(student_id, None)
+
+    for token in self.doc_tokens.pop(student_id, ()):
+      owners = self.postings.get(token)
+      if owners is None:
+        continue
+      owners.discard(student_id)
+      if owners:
+        continue
+
+      del self.postings[token]
+      position = bisect_left(self.sorted_tokens, token)
+      if position < len(self.sorted_tokens) and self.sorted_tokens[position] == token:
+        del self.sorted_tokens[position]
+      for gram in trigrams(token):
+        tokens = self.grams.get(gram)
+        if tokens is not None:
+          tokens.discard(token)
+          if not tokens:
+            del self.grams[gram]
+
+  def prefix_tokens(self, term: str):
+    position = bisect_left(self.sorted_tokens, term)
+    while position < len(self.sorted_tokens) and self.sorted_tokens[position].startswith(term):
+      yield self.sorted_tokens[position]
+      position += 1
+
+  def fuzzy_tokens(self, term: str):
+    typos = max_typos(term)
+    if not typos:
+      return
+
+    gram_sets = sorted((self.grams.get(gram, set()) for gram in trigrams(term, whole=False)), key=len)
+    needed = max(1, len(gram_sets) - 3 * typos)
+
+    # Every match shares at least `needed` grams, so it must appear in one of the rarest ones.
+    seeds = set().union(*gram_sets[:len(gram_sets) - needed + 1])
+    shared = Counter({token: sum(token in tokens for tokens in gram_sets) for token in seeds})
+
+    for token, count in shared.most_common(MAX_FUZZY_CHECKS):
+      if count < needed:
+        break
+      if fuzzy_prefix_match(term, token, typos):
+        yield token
+
+  def candidates(self, term: str, wanted: int) -> tuple[dict[str, int], bool]:
+    scores = {}
+    for student_id in self.postings.get(term, ()):
+      if len(scores) >= wanted:
+        return scores, False
+      scores[student_id] = 3
+
+    for token in self.prefix_tokens(term):
+      if len(scores) >= wanted:
+        return scores, False
+      for student_id in self.postings[token]:
+        scores.setdefault(student_id, 2)
+
+    for token in self.fuzzy_tokens(term):
+      if len(scores) >= wanted:
+        return scores, False
+      for student_id in self.postings[token]:
+        scores.setdefault(student_id, 1)
+
+    return scores, True
+
+  def prefix_score(self, student_id: str, term: str) -> int:
+    tokens = self.doc_tokens[student_id]
+    if term in tokens:
+      return 3
+    return 2 if any(token.startswith(term) for token in tokens) else 0
+
+  def search(self, query: str, limit: int) -> list[dict]:
+    terms = {term for term in TOKEN_SPLIT.split(normalize(query)) if term}
+    if not terms:
+      return []
+
+    if len(terms) == 1:
+      totals, _ = self.candidates(terms.pop(), limit)
+    else:
+      matches = [(term, *self.candidates(term, MAX_CANDIDATES)) for term in terms]
+      selective = [scores for _, scores, complete in matches if complete]
+      # Terms matching too many students to enumerate are applied as prefix filters instead.
+      broad = [term for term, _, complete in matches if not complete]
+      if not selective:
+        selective.append(next(scores for term, scores, _ in matches if term == broad[0]))
+        broad = broad[1:]
+
+      selective.sort(key=len)
+      totals = selective[0]
+      for scores in selective[1:]:
+        totals = {student_id: score + scores[student_id] for student_id, score in totals.items()
+                  if student_id in scores}
+
+      for term in broad:
+        for student_id in list(totals):
+          score = self.prefix_score(student_id, term)
+          if score:
+            totals[student_id] += score
+          else:
+            del totals[student_id]
+
+    ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [self.students[student_id] for student_id, _ in ranked]
+
+
+student_search = app_local("student_search", StudentSearchIndex)
@@ -1,8 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytz
 
 from app.database.mongoDB import collection_schedules
+from app.utils.room_index import room_index
 
 utc_timezone = pytz.UTC
 
@@ -23,6 +24,55 @@ def combine_date_and_time(date_str: str, start_str: str, end_str: str):
     return None
 
 
+def parse_date_window(from_str: str | None, to_str: str | None):
+  try:
+    current_year = datetime.now().year
+    date_from = date_to = None
+
+    if from_str:
+      date_from = datetime.strptime(f"{from_str}.{current_year}", "%d.%m.%Y").replace(tzinfo=utc_timezone)
+    if to_str:
+      date_to = (datetime.strptime(f"{to_str}.{current_year}", "%d.%m.%Y").replace(tzinfo=utc_timezone)
+                 + timedelta(days=1))
+
+    return date_from, date_to
+  except Exception:
+    return None
+
+
+RECURRENCE_STEPS = {"weekly": timedelta(weeks=1), "biweekly": timedelta(weeks=2)}
+MAX_OCCURRENCES = 200
+
+
+def expand_recurrence(date_str: str, start_str: str, end_str: str, recurrence: str, until_str: str,
+                      exceptions: list[str]):
+  date_time = combine_date_and_time(date_str, start_str, end_str)
+  until = parse_date_window(None, until_str)
+  if not date_time or not until or not until[1] or recurrence not in RECURRENCE_STEPS:
+    return None
+
+  start_datetime, end_datetime = date_time
+  step = RECURRENCE_STEPS[recurrence]
+  occurrences = []
+
+  while start_datetime < until[1] and len(occurrences) < MAX_OCCURRENCES:
+    if start_datetime.strftime("%d.%m") not in exceptions:
+      occurrences.append((start_datetime, end_datetime))
+    start_datetime, end_datetime = start_datetime + step, end_datetime + step
+
+  return occurrences
+
+
+def parse_time_of_day(time_str: str):
+  if time_str == "24:00":
+    return 86400
+  try:
+    parsed = datetime.strptime(time_str, "%H:%M")
+    return parsed.hour * 3600 + parsed.minute * 60
+  except Exception:
+    return None
+
+
 def is_time_valid(start_str: str, end_str: str) -> bool:
   try:
     start_time = datetime.strptime(start_str, "%H:%M").time()
@@ -33,12 +83,16 @@ def is_time_valid(start_str: str, end_str: str) -> bool:
 
 
 async def is_room_available(room_name: str, start_datetime: datetime, end_datetime: datetime):
-  existing_book = await collection_schedules.find_one({
-    "rooms.room_name": room_name,
-    "$or": [
-      {"start": {"$lt": end_datetime}, "end": {"$gt": start_datetime}},
-      {"start": start_datetime, "end": end_datetime}
-    ]
-  })
-
-  return existing_book is None
+  if room_index.is_stale(room_name):
+    await room_index.refresh_room(room_name)
+
+  if not room_index.overlaps(room_name, start_datetime, end_datetime):
+    return True
+
+  # The index can still hold a booking that another worker has cancelled.
+  if await collection_schedules.find_one({"rooms.room_name": room_name, "start": {"$lt": end_datetime},
+                                          "end": {"$gt": start_datetime}}, {"_id": 1}):
+    return False
+
+  await room_index.refresh_room(room_name)
+  return True
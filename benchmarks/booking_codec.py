@@ -0,0 +1,66 @@
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from app.models.codec import RoomRecord, ScheduleRecord, UserRecord
+from app.models.schedule import Room, Schedule, RoomType, ActivityType
+from app.models.users import User
+
+START = datetime(2025, 3, 1, 10, tzinfo=timezone.utc)
+END = datetime(2025, 3, 1, 11, 30, tzinfo=timezone.utc)
+USER = {"name": "Grace", "surname": "Hopper", "email": "grace@example.com", "phone_number": "+4915112345678",
+        "group_name": "CS/1", "api_key": "a1b2c3"}
+
+
+def mongoengine_schedule():
+  room = Room(name="Ada Lovelace", room_type=RoomType.CLASSROOMS, capacity=70)
+  return Schedule(rooms=room, start=START, end=END, group_name="CS/1", activity=ActivityType.LECTURE.value,
+                  status="confirmed").to_dict()
+
+
+def codec_schedule():
+  room = RoomRecord(name="Ada Lovelace", room_type=RoomType.CLASSROOMS, capacity=70)
+  return ScheduleRecord(rooms=room, start=START, end=END, group_name="CS/1", activity=ActivityType.LECTURE.value,
+                        status="confirmed").to_dict()
+
+
+def mongoengine_user():
+  return User(**USER).to_dict()
+
+
+def codec_user():
+  return UserRecord(**USER).to_dict()
+
+
+def measure(build, iterations: int):
+  began = time.perf_counter()
+  for _ in range(iterations):
+    build()
+  elapsed = time.perf_counter() - began
+
+  tracemalloc.start()
+  peaks = []
+  for _ in range(1000):
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    build()
+    peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+  tracemalloc.stop()
+
+  return elapsed / iterations * 1e6, sum(peaks) / len(peaks)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Compare mongoengine documents with the slots codec")
+  parser.add_argument("--iterations", type=int, default=20_000)
+  args = parser.parse_args()
+
+  for name, build in (("Schedule (mongoengine)", mongoengine_schedule), ("ScheduleRecord", codec_schedule),
+                      ("User (mongoengine)", mongoengine_user), ("UserRecord", codec_user)):
+    cpu, allocated = measure(build, args.iterations)
+    print(f"{name:>22}: {cpu:7.2f} us/op, {allocated:8.0f} bytes peak/op")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,59 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import time
+began = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+app.main.create_app()
+print(imported - began, time.perf_counter() - imported)
+"""
+
+
+def clean_env() -> dict:
+  # Importing and building the app must not need MONGODB, SLACK_BOT_KEY or a .env file
+  return {key: value for key, value in os.environ.items() if key not in ("MONGODB", "SLACK_BOT_KEY")}
+
+
+def measure(runs: int):
+  imports, factories = [], []
+  for _ in range(runs):
+    result = subprocess.run([sys.executable, "-c", PROBE], env=clean_env(), capture_output=True, text=True,
+                            check=True)
+    imported, created = map(float, result.stdout.split())
+    imports.append(imported * 1000)
+    factories.append(created * 1000)
+  return imports, factories
+
+
+def heaviest_imports(count: int):
+  result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"], env=clean_env(),
+                          capture_output=True, text=True, check=True)
+  rows = []
+  for line in result.stderr.splitlines()[1:]:
+    _, cumulative, name = line.split("|")
+    rows.append((int(cumulative), name.strip()))
+  return sorted(rows, reverse=True)[:count]
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Measure how long importing app.main and create_app() take")
+  parser.add_argument("--runs", type=int, default=10)
+  parser.add_argument("--top", type=int, default=10)
+  args = parser.parse_args()
+
+  imports, factories = measure(args.runs)
+  print(f"import app.main: median {statistics.median(imports):.1f} ms  max {max(imports):.1f} ms")
+  print(f"create_app():    median {statistics.median(factories):.1f} ms  max {max(factories):.1f} ms")
+
+  print("heaviest imports (cumulative):")
+  for cumulative, name in heaviest_imports(args.top):
+    print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+  main()
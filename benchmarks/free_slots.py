@@ -0,0 +1,75 @@
+import argparse
+import time
+
+import numpy as np
+
+from app.utils.free_slots import off_hours, find_gaps
+
+ROOMS = 11
+SLOT = 1800
+
+
+def synthetic_bookings(count: int, window_start: int, days: int, rng: np.random.Generator):
+  slots_per_room = days * 86400 // SLOT
+  bookings = []
+  for room in range(ROOMS):
+    room_count = count // ROOMS
+    taken = np.sort(rng.choice(slots_per_room, size=min(room_count, slots_per_room), replace=False))
+    starts = window_start + taken * SLOT
+    bookings.append((starts, starts + SLOT * rng.integers(1, 4, size=len(starts))))
+  return bookings
+
+
+def python_gaps(starts, ends, window_start, window_end, min_duration):
+  gaps, cursor = [], window_start
+  for start, end in sorted(zip(starts.tolist(), ends.tolist())):
+    if start - cursor >= min_duration:
+      gaps.append((cursor, start))
+    cursor = max(cursor, end)
+  if window_end - cursor >= min_duration:
+    gaps.append((cursor, window_end))
+  return gaps
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmark the vectorized free-slot finder")
+  parser.add_argument("--bookings", type=int, default=100_000)
+  parser.add_argument("--days", type=int, default=365)
+  parser.add_argument("--duration", type=int, default=60, help="minimum free slot in minutes")
+  parser.add_argument("--repeat", type=int, default=5)
+  args = parser.parse_args()
+
+  rng = np.random.default_rng(42)
+  window_start = int(np.datetime64("2025-01-01", "s").astype(np.int64))
+  window_end = window_start + args.days * 86400
+  bookings = synthetic_bookings(args.bookings, window_start, args.days, rng)
+  closed_starts, closed_ends = off_hours(window_start, window_end, 8 * 3600, 20 * 3600)
+
+  room_ids = np.concatenate([np.full(len(starts), room, dtype=np.int64) for room, (starts, _) in enumerate(bookings)]
+                            + [np.repeat(np.arange(ROOMS), len(closed_starts))])
+  all_starts = np.concatenate([starts for starts, _ in bookings] + [np.tile(closed_starts, ROOMS)])
+  all_ends = np.concatenate([ends for _, ends in bookings] + [np.tile(closed_ends, ROOMS)])
+
+  timings = {"numpy": [], "python": []}
+  for _ in range(args.repeat):
+    began = time.perf_counter()
+    gap_rooms, _, _ = find_gaps(room_ids, all_starts, all_ends, ROOMS, window_start, window_end, args.duration * 60)
+    numpy_total = len(gap_rooms)
+    timings["numpy"].append(time.perf_counter() - began)
+
+    began = time.perf_counter()
+    python_total = 0
+    for starts, ends in bookings:
+      python_total += len(python_gaps(np.concatenate((starts, closed_starts)), np.concatenate((ends, closed_ends)),
+                                      window_start, window_end, args.duration * 60))
+    timings["python"].append(time.perf_counter() - began)
+
+    assert numpy_total == python_total
+
+  print(f"{sum(len(starts) for starts, _ in bookings)} bookings across {ROOMS} rooms, {numpy_total} free slots")
+  for name, values in timings.items():
+    print(f"{name:>6}: best {min(values) * 1000:.2f} ms, mean {sum(values) / len(values) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+  main()
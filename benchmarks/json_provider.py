@@ -0,0 +1,59 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from quart import Quart
+from quart.json.provider import DefaultJSONProvider
+
+from app.models.schedule import ActivityType
+from app.utils.json_provider import OrjsonProvider
+from app.utils.room_registry import DEFAULT_ROOMS
+
+
+def synthetic_schedule(count: int):
+  rng = random.Random(42)
+  rooms = DEFAULT_ROOMS
+  activities = list(ActivityType)
+  begin = datetime(2025, 1, 1, tzinfo=timezone.utc)
+  room_info = {}
+
+  for _ in range(count):
+    _, room_name, room_type, _ = rng.choice(rooms)
+    start = begin + timedelta(minutes=30 * rng.randrange(17520))
+    room_info.setdefault(room_type.value, {}).setdefault(room_name, []).append({
+      "start": start,
+      "end": start + timedelta(minutes=90),
+      "group_name": f"G{rng.randrange(40)}",
+      "activity": rng.choice(activities).value,
+    })
+
+  return room_info
+
+
+def measure(provider, payload, repeat: int):
+  timings = []
+  for _ in range(repeat):
+    began = time.perf_counter()
+    provider.dumps(payload)
+    timings.append(time.perf_counter() - began)
+  return timings
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmark the orjson provider against the stdlib provider")
+  parser.add_argument("--bookings", type=int, default=50_000)
+  parser.add_argument("--repeat", type=int, default=10)
+  args = parser.parse_args()
+
+  app = Quart(__name__)
+  payload = synthetic_schedule(args.bookings)
+
+  for name, provider in (("stdlib", DefaultJSONProvider(app)), ("orjson", OrjsonProvider(app))):
+    timings = measure(provider, payload, args.repeat)
+    print(f"{name:>6}: best {min(timings) * 1000:.2f} ms, mean {sum(timings) / len(timings) * 1000:.2f} ms, "
+          f"{len(provider.dumps(payload)) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+  main()
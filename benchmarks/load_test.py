@@ -0,0 +1,307 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from bson import ObjectId
+
+WORKLOADS = {
+  "book_room": 20,
+  "cancel_room": 10,
+  "list_all": 10,
+  "list_page": 20,
+  "filter_room": 25,
+  "websocket_booking": 15,
+}
+SEED_YEAR = datetime.now(timezone.utc).year - 1
+
+
+def accept_sort(add_update):
+  # pymongo 4.9+ passes sort= to add_update, which mongomock 4.3 does not accept yet
+  def wrapper(self, *args, sort=None, **kwargs):
+    return add_update(self, *args, **kwargs)
+  return wrapper
+
+
+def stand_in_client():
+  import mongomock
+  from mongomock.collection import BulkOperationBuilder
+  from mongomock_motor import AsyncMongoMockClient
+
+  mongomock.SERVER_VERSION = "6.0"
+  BulkOperationBuilder.add_update = accept_sort(BulkOperationBuilder.add_update)
+  return AsyncMongoMockClient()
+
+
+async def seed(users: int, bookings: int, rng: random.Random):
+  from app.database import mongoDB as mongo
+  from app.utils.room_registry import DEFAULT_ROOMS
+
+  admin_key = secrets.token_hex(16)
+  student_keys = [secrets.token_hex(16) for _ in range(users)]
+  await mongo.collection_users.insert_one({"name": "Bench", "surname": "Admin", "role": "admin",
+                                           "api_key": admin_key})
+  await mongo.collection_users.insert_many([
+    {"name": "Student", "surname": f"Number{i}", "email": f"student{i}@bench.local",
+     "phone_number": f"+4900000{i:08d}", "role": "student", "group_name": f"G{i % 40}",
+     "api_key": api_key}
+    for i, api_key in enumerate(student_keys)])
+
+  rooms = DEFAULT_ROOMS
+  begin = datetime(SEED_YEAR, 1, 1, tzinfo=timezone.utc)
+  slots_per_day = 24
+  # Spread the bookings over enough days to keep the rooms at most half full
+  days = max(365, -(-2 * bookings // (len(rooms) * slots_per_day)))
+  ledger = {}
+  batch = []
+
+  for key in rng.sample(range(len(rooms) * days * slots_per_day), bookings):
+    position, key = divmod(key, days * slots_per_day)
+    day, slot = divmod(key, slots_per_day)
+    room = rooms[position]
+
+    start = begin + timedelta(days=day, minutes=8 * 60 + 30 * slot)
+    document = {
+      "_id": ObjectId(),
+      "rooms": {"room_type": room[2].value, "room_name": room[1], "capacity": room[3]},
+      "start": start,
+      "end": start + timedelta(minutes=30),
+      "group_name": f"G{rng.randrange(40)}",
+      "activity": "Lecture",
+      "requested_capacity": None,
+      "status": "confirmed",
+    }
+    batch.append(document)
+    ledger.setdefault((room[1], start.replace(hour=0, minute=0, tzinfo=None)), []).append(
+      {"start": document["start"], "end": document["end"], "booking_id": document["_id"]})
+
+    if len(batch) == 10_000:
+      await mongo.collection_schedules.insert_many(batch)
+      batch = []
+
+  if batch:
+    await mongo.collection_schedules.insert_many(batch)
+
+  reservations = [{"room_name": room_name, "day": day, "intervals": intervals}
+                  for (room_name, day), intervals in ledger.items()]
+  for offset in range(0, len(reservations), 10_000):
+    await mongo.collection_reservations.insert_many(reservations[offset:offset + 10_000])
+
+  return admin_key, student_keys
+
+
+class Recorder:
+  def __init__(self):
+    self.latencies = {name: [] for name in WORKLOADS}
+    self.statuses = {name: {} for name in WORKLOADS}
+
+  def record(self, name: str, began: float, status: int):
+    self.latencies[name].append(time.perf_counter() - began)
+    self.statuses[name][str(status)] = self.statuses[name].get(str(status), 0) + 1
+
+  def summary(self, elapsed: float):
+    report = {}
+    for name, values in self.latencies.items():
+      if not values:
+        continue
+      ordered = sorted(values)
+      report[name] = {
+        "requests": len(ordered),
+        "rps": len(ordered) / elapsed,
+        "p50_ms": ordered[int(len(ordered) * 0.50)] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+        "statuses": self.statuses[name],
+      }
+    total = sum(len(values) for values in self.latencies.values())
+    report["total"] = {"requests": total, "rps": total / elapsed}
+    return report
+
+
+class Workload:
+  def __init__(self, client, recorder: Recorder, rng: random.Random, admin_key: str, student_keys: list[str]):
+    from app.utils.room_registry import DEFAULT_ROOMS
+
+    self.client = client
+    self.recorder = recorder
+    self.rng = rng
+    self.student_keys = student_keys
+    self.rooms = [name for _, name, _, _ in DEFAULT_ROOMS]
+    self.booked = []
+    self.admin = {"X-API-Key": admin_key}
+
+  def slot(self):
+    start = 8 + self.rng.randrange(12)
+    return (f"{self.rng.randrange(1, 29):02d}.{self.rng.randrange(1, 13):02d}",
+            f"{start:02d}:00", f"{start + 1:02d}:00")
+
+  async def book_room(self):
+    date, start, end = self.slot()
+    room_name = self.rng.choice(self.rooms)
+    began = time.perf_counter()
+    response = await self.client.post("/admin/book_room", headers=self.admin, json={
+      "room_name": room_name, "start_time": start, "end_time": end, "date": date,
+      "activity": "Lecture", "group_name": "G1"})
+    self.recorder.record("book_room", began, response.status_code)
+    if response.status_code == 200:
+      self.booked.append((room_name, date, start, end))
+
+  async def cancel_room(self):
+    if not self.booked:
+      return await self.book_room()
+    room_name, date, start, end = self.booked.pop(self.rng.randrange(len(self.booked)))
+    began = time.perf_counter()
+    response = await self.client.post("/admin/cancel_room", headers=self.admin, json={
+      "room_name": room_name, "start": start, "end": end, "date": date})
+    self.recorder.record("cancel_room", began, response.status_code)
+
+  async def list_all(self):
+    began = time.perf_counter()
+    response = await self.client.get("/classroom/")
+    await response.get_data()
+    self.recorder.record("list_all", began, response.status_code)
+
+  async def list_page(self):
+    began = time.perf_counter()
+    response = await self.client.get("/classroom/?limit=100")
+    self.recorder.record("list_page", began, response.status_code)
+
+  async def filter_room(self):
+    began = time.perf_counter()
+    response = await self.client.get(f"/classroom/room?room_name={self.rng.choice(self.rooms)}")
+    self.recorder.record("filter_room", began, response.status_code)
+
+  async def websocket_booking(self):
+    date, start, end = self.slot()
+    student = {"X-API-Key": self.rng.choice(self.student_keys)}
+    began = time.perf_counter()
+
+    async with self.client.websocket("/admin/ws") as admin_ws:
+      async with self.client.websocket("/classroom/ws", headers=student) as student_ws:
+        await student_ws.send(json.dumps({"room_name": self.rng.choice(self.rooms), "start_time": start,
+                                          "end_time": end, "date": date, "capacity": 2,
+                                          "activity": "Meeting", "group_name": "G1"}))
+        reply = json.loads(await student_ws.receive())
+
+      if "request_id" not in reply:
+        self.recorder.record("websocket_booking", began, 409)
+        return
+
+      await admin_ws.send(json.dumps({"status": "confirmed", "request_id": reply["request_id"]}))
+      while True:
+        message = await admin_ws.receive()
+        if message.startswith("{") and json.loads(message).get("request_id") == reply["request_id"]:
+          break
+
+    self.recorder.record("websocket_booking", began, 200)
+
+  async def run(self, deadline: float):
+    names, weights = zip(*WORKLOADS.items())
+    while time.perf_counter() < deadline:
+      await getattr(self, self.rng.choices(names, weights)[0])()
+
+
+def git_revision():
+  try:
+    return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+  except Exception:
+    return "unknown"
+
+
+def compare(report: dict, baseline_path: Path):
+  baseline = json.loads(baseline_path.read_text())["results"]
+  for name, current in report.items():
+    previous = baseline.get(name)
+    if not previous or "p95_ms" not in current:
+      continue
+    change = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100
+    print(f"{name:>18}: p95 {previous['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms ({change:+.0f}%)")
+
+
+async def main():
+  parser = argparse.ArgumentParser(description="Load-test the booking and listing APIs")
+  parser.add_argument("--mongodb", default=None,
+                      help="MongoDB URI to run against; without it an in-process stand-in is used")
+  parser.add_argument("--database", default=None,
+                      help="empty database to seed when --mongodb is given; it is dropped afterwards")
+  parser.add_argument("--bookings", type=int, default=1_000)
+  parser.add_argument("--users", type=int, default=1_000)
+  parser.add_argument("--concurrency", type=int, default=16)
+  parser.add_argument("--duration", type=float, default=30.0)
+  parser.add_argument("--seed", type=int, default=1)
+  parser.add_argument("--output", type=Path, default=None)
+  parser.add_argument("--compare", type=Path, default=None)
+  args = parser.parse_args()
+
+  if args.mongodb:
+    if not args.database or args.database == "classroom":
+      parser.error("--mongodb needs --database naming a separate, empty database for the benchmark data")
+    os.environ["MONGODB"] = args.mongodb
+    os.environ["MONGODB_DATABASE"] = args.database
+    mongo_client = None
+  else:
+    os.environ.setdefault("MONGODB", "mongodb://localhost:27017")
+    mongo_client = stand_in_client()
+
+  from app.database import mongoDB as mongo
+  from app.main import create_app
+  from app.utils.send_to_admin import slack_notifier
+
+  app = create_app(mongo_client)
+  async with app.app_context():
+    connection = mongo.connect()
+    if args.mongodb and await mongo.get_database().list_collection_names():
+      raise SystemExit(f"database {args.database} is not empty; refusing to seed benchmark data into it")
+
+    try:
+      rng = random.Random(args.seed)
+      admin_key, student_keys = await seed(args.users, args.bookings, rng)
+      slack_notifier.max_retries = 0
+
+      recorder = Recorder()
+      client = app.test_client()
+      async with app.test_app():
+        began = time.perf_counter()
+        workers = [Workload(client, recorder, random.Random(args.seed + i), admin_key, student_keys)
+                   for i in range(args.concurrency)]
+        await asyncio.gather(*(worker.run(began + args.duration) for worker in workers))
+        elapsed = time.perf_counter() - began
+    finally:
+      if args.mongodb:
+        await connection.drop_database(args.database)
+      mongo.close()
+
+  report = recorder.summary(elapsed)
+  for name, values in report.items():
+    if "p50_ms" in values:
+      print(f"{name:>18}: {values['rps']:8.1f} rps  p50 {values['p50_ms']:7.1f} ms  "
+            f"p95 {values['p95_ms']:7.1f} ms  p99 {values['p99_ms']:7.1f} ms  {values['statuses']}")
+  print(f"{'total':>18}: {report['total']['rps']:8.1f} rps")
+
+  revision = git_revision()
+  output = args.output or Path("bench_results") / f"{revision}-{args.bookings}.json"
+  output.parent.mkdir(parents=True, exist_ok=True)
+  output.write_text(json.dumps({
+    "revision": revision,
+    "timestamp": datetime.now(timezone.utc).isoformat(),
+    "python": sys.version.split()[0],
+    "stand_in": not args.mongodb,
+    "parameters": {key: str(value) for key, value in vars(args).items() if key != "mongodb"},
+    "results": report,
+  }, indent=2))
+  print(f"results written to {output}")
+
+  if args.compare:
+    compare(report, args.compare)
+
+
+if __name__ == "__main__":
+  os.environ.setdefault("SLACK_BOT_KEY", "bench")
+  asyncio.run(main())
@@ -0,0 +1,56 @@
+import argparse
+import random
+import string
+import time
+
+from bson import ObjectId
+
+from app.utils.student_search import StudentSearchIndex
+
+QUERIES = ["ole", "olena", "olnea", "kovalenko", "kovlaenko", "olena kovalenko", "kn/12", "0501", "iryna kn/3"]
+
+
+def random_word(rng: random.Random, shortest: int, longest: int) -> str:
+  return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(shortest, longest)))
+
+
+def build_index(users: int, seed: int) -> StudentSearchIndex:
+  rng = random.Random(seed)
+  names = [random_word(rng, 4, 8) for _ in range(400)] + ["olena", "iryna", "petro"]
+  surnames = [random_word(rng, 6, 11) for _ in range(3000)] + ["kovalenko", "shevchenko"]
+
+  index = StudentSearchIndex()
+  for _ in range(users):
+    name, surname = rng.choice(names), rng.choice(surnames)
+    index.add({"_id": ObjectId(), "name": name.title(), "surname": surname.title(),
+               "email": f"{name}.{surname}{rng.randrange(100)}@example.edu",
+               "phone_number": f"+38050{rng.randrange(10 ** 7):07d}",
+               "group_name": f"KN/{rng.randrange(40)}"}, keep_sorted=False)
+  index.sorted_tokens.sort()
+  return index
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Measure student search latency on a synthetic directory")
+  parser.add_argument("--users", type=int, default=100_000)
+  parser.add_argument("--repeat", type=int, default=50)
+  parser.add_argument("--limit", type=int, default=20)
+  parser.add_argument("--seed", type=int, default=1)
+  args = parser.parse_args()
+
+  began = time.perf_counter()
+  index = build_index(args.users, args.seed)
+  print(f"indexed {args.users} users ({len(index.sorted_tokens)} tokens) in {time.perf_counter() - began:.2f}s")
+
+  for query in QUERIES:
+    timings = []
+    for _ in range(args.repeat):
+      began = time.perf_counter()
+      results = index.search(query, args.limit)
+      timings.append((time.perf_counter() - began) * 1000)
+    timings.sort()
+    print(f"{query:>18}: {len(results):3d} hits  p50 {timings[len(timings) // 2]:.2f}ms  max {timings[-1]:.2f}ms")
+
+
+if __name__ == "__main__":
+  main()
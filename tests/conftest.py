@@ -0,0 +1,52 @@
+import asyncio
+import inspect
+import os
+
+import mongomock
+import pytest
+from mongomock.collection import BulkOperationBuilder
+from mongomock_motor import AsyncMongoMockClient
+
+os.environ.setdefault("MONGODB", "mongodb://localhost:27017")
+os.environ.setdefault("SLACK_BOT_KEY", "test")
+mongomock.SERVER_VERSION = "6.0"
+
+from app.config.settings import settings  # noqa: E402
+from app.main import create_app  # noqa: E402
+from app.utils.send_to_admin import SlackNotifier  # noqa: E402
+
+
+def accept_sort(add_update):
+  # pymongo 4.9+ passes sort= to add_update, which mongomock 4.3 does not accept yet
+  def wrapper(self, *args, sort=None, **kwargs):
+    return add_update(self, *args, **kwargs)
+  return wrapper
+
+
+BulkOperationBuilder.add_update = accept_sort(BulkOperationBuilder.add_update)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+  if not inspect.iscoroutinefunction(pyfuncitem.obj):
+    return None
+  parameters = inspect.signature(pyfuncitem.obj).parameters
+  asyncio.run(pyfuncitem.obj(**{name: pyfuncitem.funcargs[name] for name in parameters}))
+  return True
+
+
+@pytest.fixture
+def mongo_client():
+  return AsyncMongoMockClient()
+
+
+@pytest.fixture
+def database(mongo_client):
+  return mongo_client[settings.MONGODB_DATABASE]
+
+
+@pytest.fixture
+def app(mongo_client):
+  app = create_app(mongo_client)
+  app.extensions["classroom"]["slack_notifier"] = SlackNotifier(url="http://127.0.0.1:9/", max_retries=0)
+  return app
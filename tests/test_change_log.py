@@ -0,0 +1,73 @@
+import logging
+from datetime import datetime, timedelta
+from unittest import mock
+
+from bson import ObjectId
+
+from app.utils.change_log import CHANGE_COUNTER, SKIPPED, changes_since, decode_token, record_changes
+
+SETTLED = timedelta(minutes=1)
+
+
+def schedule(room_name: str = "Sirius") -> dict:
+  start = datetime(2030, 1, 1, 8)
+  return {"_id": ObjectId(), "rooms": {"room_name": room_name, "room_type": "Meeting Rooms"}, "start": start,
+          "end": start + timedelta(hours=1), "group_name": "G1", "activity": "Lecture"}
+
+
+def change(sequence: int, at: datetime) -> dict:
+  return {"_id": sequence, "op": "created", "booking": {"id": str(sequence)}, "at": at}
+
+
+async def test_expired_tokens_are_rejected_even_when_the_log_is_empty(app, database):
+  await database.counters.insert_one({"_id": CHANGE_COUNTER, "seq": 5, "at": datetime.utcnow() - SETTLED})
+
+  async with app.app_context():
+    assert await changes_since(2, 10) is None
+    page = await changes_since(5, 10)
+    assert page["changes"] == [] and decode_token(page["token"]) == 5
+
+    await database.schedule_changes.insert_many([change(8, datetime.utcnow()), change(9, datetime.utcnow())])
+    assert await changes_since(5, 10) is None
+    assert [row["sequence"] for row in (await changes_since(7, 10))["changes"]] == [8, 9]
+
+
+async def test_fresh_gaps_hold_the_token_back(app, database):
+  now = datetime.utcnow()
+  await database.schedule_changes.insert_many([change(1, now), change(3, now)])
+
+  async with app.app_context():
+    page = await changes_since(0, 10)
+
+  assert [row["sequence"] for row in page["changes"]] == [1]
+  assert decode_token(page["token"]) == 1 and page["has_more"]
+
+
+async def test_stale_gaps_are_filled_and_a_late_writer_records_again(app, database):
+  old = datetime.utcnow() - SETTLED
+  await database.schedule_changes.insert_many([change(1, old), change(3, old)])
+  await database.counters.insert_one({"_id": CHANGE_COUNTER, "seq": 1, "at": old})
+
+  async with app.app_context():
+    page = await changes_since(0, 10)
+    assert [row["sequence"] for row in page["changes"]] == [1, 3]
+    assert decode_token(page["token"]) == 3
+    assert (await database.schedule_changes.find_one({"_id": 2}))["op"] == SKIPPED
+
+    # The writer that took sequence number 2 finally arrives.
+    late = schedule()
+    await record_changes("created", [late])
+    page = await changes_since(3, 10)
+
+  assert [(row["sequence"], row["booking"]["id"]) for row in page["changes"]] == [(4, str(late["_id"]))]
+
+
+async def test_failed_change_writes_are_logged_not_raised(app, database, caplog):
+  async def fail(*args, **kwargs):
+    raise RuntimeError("insert failed")
+
+  async with app.app_context():
+    with mock.patch.object(type(database.schedule_changes), "insert_many", fail), caplog.at_level(logging.ERROR):
+      await record_changes("cancelled", [schedule()])
+
+  assert "Recording 1 cancelled changes failed" in caplog.text
@@ -0,0 +1,17 @@
+from app.models.users import Role
+from app.utils.check_role import role_cache, verify_user_role
+from app.utils.shared_generation import SharedGeneration
+from tests.test_reservations import STUDENT, add_users
+
+
+async def test_a_deletion_on_another_worker_clears_cached_roles(app, database):
+  async with app.app_context():
+    await add_users(database)
+    assert await verify_user_role(STUDENT["X-API-Key"]) == Role.STUDENT
+
+    await database.users.delete_one({"api_key": STUDENT["X-API-Key"]})
+    await SharedGeneration("role_cache").bump()
+    assert await verify_user_role(STUDENT["X-API-Key"]) == Role.STUDENT
+
+    role_cache.shared.checked_at = None
+    assert await verify_user_role(STUDENT["X-API-Key"]) is None
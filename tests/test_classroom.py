@@ -0,0 +1,45 @@
+import json
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from unittest import mock
+
+
+async def test_booking_stream_reads_every_row(app, database):
+  first = datetime(2030, 1, 1, 8)
+  async with app.test_app():
+    await database.schedules.insert_many([{
+      "rooms": {"room_name": "Sirius", "room_type": "Meeting Rooms", "capacity": 6},
+      "start": first + timedelta(hours=hour), "end": first + timedelta(hours=hour, minutes=30),
+      "group_name": "G1", "activity": "Meeting", "status": "confirmed"} for hour in range(30)])
+
+    response = await app.test_client().get("/classroom/?format=ndjson")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in (await response.get_data(as_text=True)).splitlines()]
+
+  assert len(rows) == 30
+  starts = [parsedate_to_datetime(row["start"]) for row in rows]
+  assert starts == sorted(starts)
+  assert rows[0] == {"id": rows[0]["id"], "room_type": "Meeting Rooms", "room_name": "Sirius",
+                     "start": "Tue, 01 Jan 2030 08:00:00 GMT", "end": "Tue, 01 Jan 2030 08:30:00 GMT", "group_name": "G1",
+                     "activity": "Meeting"}
+
+
+async def test_room_lookup_errors_are_not_cached(app, database):
+  async with app.test_app():
+    await database.schedules.insert_one({
+      "rooms": {"room_name": "Sirius", "room_type": "Meeting Rooms", "capacity": 6},
+      "start": datetime(2030, 1, 1, 8), "end": datetime(2030, 1, 1, 9), "group_name": "G1", "activity": "Meeting",
+      "status": "confirmed"})
+    client = app.test_client()
+
+    async def fail(*args, **kwargs):
+      raise RuntimeError("mongo unavailable")
+
+    with mock.patch("app.routers.student.StudentService.filtered_rooms", fail):
+      response = await client.get("/classroom/room?room_type=Meeting%20Rooms")
+      assert response.status_code == 500
+      assert "ETag" not in response.headers
+
+    response = await client.get("/classroom/room?room_type=Meeting%20Rooms")
+    assert response.status_code == 200
@@ -0,0 +1,26 @@
+from unittest import mock
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.database.indexes import drop_outdated_indexes, index_drift
+
+MODELS = [IndexModel([("created_at", ASCENDING)], name="created_at", expireAfterSeconds=60),
+          IndexModel([("email", ASCENDING)], name="email")]
+
+
+async def test_drift_is_reported_without_touching_indexes(database):
+  await database.pending_bookings.create_index([("created_at", ASCENDING)], name="created_at")
+
+  assert await index_drift(database.pending_bookings, MODELS) == (["email"], ["created_at"])
+  assert set(await database.pending_bookings.index_information()) == {"_id_", "created_at"}
+
+
+async def test_an_index_dropped_by_another_worker_is_ignored(database):
+  await database.pending_bookings.create_index([("created_at", ASCENDING)], name="created_at")
+
+  async def already_dropped(*args, **kwargs):
+    raise OperationFailure("index not found with name [created_at]", code=27)
+
+  with mock.patch.object(type(database.pending_bookings), "drop_index", already_dropped):
+    await drop_outdated_indexes(database.pending_bookings, MODELS)
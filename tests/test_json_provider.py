@@ -0,0 +1,74 @@
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+import orjson
+import pytest
+from bson import ObjectId
+from quart import Quart
+from werkzeug.http import http_date
+
+from app.config.settings import get_settings
+from app.models.schedule import ActivityType
+from app.utils.json_provider import dumps_bytes, rfc822
+
+
+@pytest.fixture
+def iso8601(monkeypatch):
+  monkeypatch.setattr(get_settings(), "JSON_DATETIME_FORMAT", "iso8601")
+
+
+def test_datetimes_keep_quarts_rfc822_format_by_default():
+  plus_two = timezone(timedelta(hours=2))
+  payload = {"naive": datetime(2030, 1, 1, 8), "local": datetime(2030, 1, 1, 10, tzinfo=plus_two)}
+  assert orjson.loads(dumps_bytes(payload)) == json.loads(Quart(__name__).json.dumps(payload))
+  assert orjson.loads(dumps_bytes(payload)) == {"naive": "Tue, 01 Jan 2030 08:00:00 GMT",
+                                                "local": "Tue, 01 Jan 2030 08:00:00 GMT"}
+
+
+def test_rfc822_matches_werkzeug_http_date():
+  rng = random.Random(3)
+  for _ in range(500):
+    moment = datetime(2000, 1, 1) + timedelta(seconds=rng.randrange(40 * 365 * 86400))
+    offset = timezone(timedelta(minutes=15 * rng.randrange(-48, 56)))
+    assert rfc822(moment) == http_date(moment)
+    assert rfc822(moment.replace(tzinfo=offset)) == http_date(moment.replace(tzinfo=offset))
+
+
+def test_naive_datetimes_are_sent_as_utc(iso8601):
+  assert orjson.loads(dumps_bytes({"start": datetime(2030, 1, 1, 8)})) == {"start": "2030-01-01T08:00:00Z"}
+
+
+def test_aware_datetimes_keep_their_offset(iso8601):
+  plus_two = timezone(timedelta(hours=2))
+  payload = {"utc": datetime(2030, 1, 1, 8, tzinfo=timezone.utc), "local": datetime(2030, 1, 1, 10, tzinfo=plus_two)}
+  assert orjson.loads(dumps_bytes(payload)) == {"utc": "2030-01-01T08:00:00Z", "local": "2030-01-01T10:00:00+02:00"}
+
+
+def test_object_ids_and_enums():
+  booking_id = ObjectId()
+  payload = {"_id": booking_id, "activity": ActivityType.LECTURE}
+  assert orjson.loads(dumps_bytes(payload)) == {"_id": str(booking_id), "activity": "Lecture"}
+
+
+async def list_one_booking(app, database) -> dict:
+  async with app.test_app():
+    await database.schedules.insert_one({
+      "rooms": {"room_name": "Sirius", "room_type": "Meeting Rooms", "capacity": 6},
+      "start": datetime(2030, 1, 1, 8), "end": datetime(2030, 1, 1, 9),
+      "group_name": "G1", "activity": "Meeting", "status": "confirmed"})
+
+    response = await app.test_client().get("/classroom/?limit=10")
+    return (await response.get_json())["bookings"][0]
+
+
+async def test_responses_keep_rfc822_timestamps_by_default(app, database):
+  booking = await list_one_booking(app, database)
+  assert booking["start"] == "Tue, 01 Jan 2030 08:00:00 GMT"
+  assert booking["end"] == "Tue, 01 Jan 2030 09:00:00 GMT"
+
+
+async def test_responses_carry_iso8601_timestamps_when_configured(app, database, iso8601):
+  booking = await list_one_booking(app, database)
+  assert booking["start"] == "2030-01-01T08:00:00Z"
+  assert booking["end"] == "2030-01-01T09:00:00Z"
@@ -0,0 +1,51 @@
+import pytest
+from pydantic import ValidationError
+
+from app.config.settings import Settings
+
+
+async def test_metrics_export_role_cache_counters(app, database):
+  async with app.test_app():
+    client = app.test_client()
+    await client.get("/admin/students", headers={"X-API-Key": "unknown"})
+    await client.get("/admin/students", headers={"X-API-Key": "unknown"})
+
+    metrics = await (await client.get("/metrics")).get_data(as_text=True)
+
+  assert "role_cache_hits_total 1.0" in metrics
+  assert "role_cache_misses_total 1.0" in metrics
+  assert "role_cache_entries 1.0" in metrics
+
+
+async def test_metrics_export_broadcast_drops_and_lag(app, database):
+  async with app.test_app():
+    client = app.test_client()
+
+    async with client.websocket("/admin/ws") as admin_ws:
+      await admin_ws.send("{}")
+      await admin_ws.receive()
+      registry = app.extensions["classroom"]["active_connections_st"]
+      registry.dropped, registry.disconnected = 3, 1
+      metrics = await (await client.get("/metrics")).get_data(as_text=True)
+
+  assert "broadcast_dropped_messages_total 3.0" in metrics
+  assert "broadcast_disconnects_total 1.0" in metrics
+  assert 'broadcast_lag_seconds{connection="' in metrics
+
+
+def test_unknown_slow_consumer_policy_is_rejected():
+  with pytest.raises(ValidationError):
+    Settings(MONGODB="mongodb://localhost", SLACK_BOT_KEY="key", BROADCAST_SLOW_POLICY="block")
+
+
+async def test_metrics_export_slack_notifier_stats(app, database):
+  async with app.test_app():
+    notifier = app.extensions["classroom"]["slack_notifier"]
+    notifier.sent, notifier.failed, notifier.dropped, notifier.retries = 5, 2, 1, 7
+    metrics = await (await app.test_client().get("/metrics")).get_data(as_text=True)
+
+  assert "slack_queue_depth 0.0" in metrics
+  assert 'slack_messages_total{outcome="sent"} 5.0' in metrics
+  assert 'slack_messages_total{outcome="failed"} 2.0' in metrics
+  assert 'slack_messages_total{outcome="dropped"} 1.0' in metrics
+  assert "slack_retries_total 7.0" in metrics
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import random
+from unittest import mock
+
+import pytest
+
+ADMIN = {"X-API-Key": "test-admin"}
+STUDENT = {"X-API-Key": "test-student"}
+ROOMS = ("Sirius", "Proxima", "Darth Vader")
+DATE = "14.12"
+
+
+async def add_users(database):
+  await database.users.insert_many([
+    {"name": "Test", "surname": "Admin", "role": "admin", "api_key": ADMIN["X-API-Key"]},
+    {"name": "Test", "surname": "Student", "role": "student", "api_key": STUDENT["X-API-Key"],
+     "email": "student@test.local", "phone_number": "+490000000001", "group_name": "G1"},
+  ])
+
+
+def random_slot(rng: random.Random):
+  start = 8 * 60 + 30 * rng.randrange(8)
+  end = start + rng.choice((30, 60, 90))
+  return f"{start // 60:02d}:{start % 60:02d}", f"{end // 60:02d}:{end % 60:02d}"
+
+
+async def assert_no_double_bookings(database):
+  schedules = await database.schedules.find({}, {"rooms.room_name": 1, "start": 1, "end": 1}).to_list(length=None)
+  by_room = {}
+  for schedule in schedules:
+    by_room.setdefault(schedule["rooms"]["room_name"], []).append((schedule["start"], schedule["end"]))
+  for intervals in by_room.values():
+    intervals.sort()
+    for (_, previous_end), (start, _) in zip(intervals, intervals[1:]):
+      assert start >= previous_end
+
+  ledger = await database.room_reservations.find({}).to_list(length=None)
+  assert sum(len(document["intervals"]) for document in ledger) == len(schedules)
+  return schedules
+
+
+async def request_booking(client, room_name: str, start: str, end: str):
+  async with client.websocket("/classroom/ws", headers=STUDENT) as student_ws:
+    await student_ws.send(json.dumps({"room_name": room_name, "start_time": start, "end_time": end, "date": DATE,
+                                      "capacity": 2, "activity": "Meeting", "group_name": "G1"}))
+    return json.loads(await student_ws.receive()).get("request_id")
+
+
+async def confirm_booking(client, request_id: str):
+  async with client.websocket("/admin/ws") as admin_ws:
+    await admin_ws.send(json.dumps({"status": "confirmed", "request_id": request_id}))
+    while True:
+      message = await admin_ws.receive()
+      if message.startswith("{") and json.loads(message).get("request_id") == request_id:
+        return json.loads(message)
+
+
+@pytest.mark.parametrize("attempts", [60, 600])
+async def test_concurrent_bookings_never_double_book(app, database, attempts):
+  rng = random.Random(attempts)
+
+  async with app.test_app():
+    await add_users(database)
+    client = app.test_client()
+
+    pending = []
+    for _ in range(attempts // 6):
+      request_id = await request_booking(client, rng.choice(ROOMS), *random_slot(rng))
+      if request_id:
+        pending.append(request_id)
+
+    async def book_room():
+      start, end = random_slot(rng)
+      response = await client.post("/admin/book_room", headers=ADMIN, json={
+        "room_name": rng.choice(ROOMS), "start_time": start, "end_time": end, "date": DATE,
+        "activity": "Lecture", "group_name": "G1"})
+      return "book_room", response.status_code
+
+    async def book_recurring():
+      start, end = random_slot(rng)
+      response = await client.post("/admin/book_recurring", headers=ADMIN, json={
+        "room_name": rng.choice(ROOMS), "start_time": start, "end_time": end, "date": DATE,
+        "recurrence": "weekly", "until": "28.12", "activity": "Lecture", "group_name": "G1",
+        "on_conflict": "partial"})
+      return "book_recurring", response.status_code
+
+    async def confirm(request_id: str):
+      reply = await confirm_booking(client, request_id)
+      return "websocket", 200 if "schedule_id" in reply else 409
+
+    concurrent = [book_room() for _ in range(attempts * 2 // 3)] + [book_recurring() for _ in range(attempts // 6)]
+    concurrent += [confirm(request_id) for request_id in pending]
+    results = await asyncio.gather(*concurrent)
+
+    schedules = await assert_no_double_bookings(database)
+
+  statuses = {}
+  for path, status in results:
+    statuses.setdefault(path, set()).add(status)
+  assert statuses["book_room"] <= {200, 409}
+  assert statuses["book_recurring"] <= {201, 409}
+  assert statuses["websocket"] <= {200, 409}
+  assert 409 in statuses["book_room"]
+  assert len(schedules) > len(ROOMS)
+
+
+async def test_failed_recurring_insert_releases_reserved_slots(app, database):
+  series = {"room_name": "Sirius", "start_time": "10:00", "end_time": "11:00", "date": DATE, "recurrence": "weekly",
+            "until": "28.12", "activity": "Lecture", "group_name": "G1"}
+
+  async with app.test_app():
+    await add_users(database)
+    client = app.test_client()
+
+    async def fail(*args, **kwargs):
+      raise RuntimeError("insert failed")
+
+    with mock.patch.object(type(database.schedules), "insert_many", fail):
+      response = await client.post("/admin/book_recurring", headers=ADMIN, json=series)
+      assert response.status_code == 500
+
+    ledger = await database.room_reservations.find({}).to_list(length=None)
+    assert all(not document["intervals"] for document in ledger)
+
+    response = await client.post("/admin/book_recurring", headers=ADMIN, json=series)
+    assert response.status_code == 201
+    assert len((await response.get_json())["booked"]) == 3
+    await assert_no_double_bookings(database)
+
+
+async def test_failed_confirmation_keeps_the_request_pending(app, database):
+  async with app.test_app():
+    await add_users(database)
+    client = app.test_client()
+    request_id = await request_booking(client, "Sirius", "10:00", "11:00")
+
+    insert_one = type(database.schedules).insert_one
+
+    async def fail_schedules(collection, *args, **kwargs):
+      if collection.name == "schedules":
+        raise ValueError("insert failed")
+      return await insert_one(collection, *args, **kwargs)
+
+    with mock.patch.object(type(database.schedules), "insert_one", fail_schedules):
+      async with client.websocket("/admin/ws") as admin_ws:
+        await admin_ws.send(json.dumps({"status": "confirmed", "request_id": request_id}))
+        assert json.loads(await admin_ws.receive()) == {"error": "insert failed"}
+
+    assert await database.pending_bookings.count_documents({}) == 1
+    assert "schedule_id" in await confirm_booking(client, request_id)
+    assert await database.pending_bookings.count_documents({}) == 0
+    await assert_no_double_bookings(database)
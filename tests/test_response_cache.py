@@ -0,0 +1,18 @@
+from app.utils.response_cache import ResponseCache
+
+
+async def test_a_write_on_one_worker_invalidates_the_others(app, database):
+  key = ("/classroom/", ())
+  async with app.app_context():
+    writer, reader = ResponseCache(), ResponseCache()
+    await reader.refresh()
+    reader.put(key, b"[]", "application/json")
+
+    await writer.bump()
+    await reader.refresh()
+    assert reader.get(key) is not None
+
+    reader.shared.checked_at = None
+    await reader.refresh()
+    assert reader.get(key) is None
+    assert reader.generation == writer.generation == 1
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from app.database.mongoDB import collection_rollups
+from app.utils.rollups import record_bookings
+
+
+def booking(start_hour: int, requested_capacity: int | None = None) -> dict:
+  schedule = {"rooms": {"room_name": "Sirius", "room_type": "Lecture", "capacity": 120},
+              "start": datetime(2030, 1, 1, start_hour), "end": datetime(2030, 1, 1, start_hour + 1),
+              "activity": "Lecture"}
+  if requested_capacity is not None:
+    schedule["requested_capacity"] = requested_capacity
+  return schedule
+
+
+async def test_admin_bookings_do_not_count_towards_peak_capacity(app):
+  async with app.test_app():
+    async with app.app_context():
+      await record_bookings([booking(8)])
+      rollup = await collection_rollups.find_one({"room_name": "Sirius"})
+      assert rollup["booking_count"] == 1
+      assert "peak_requested_capacity" not in rollup
+
+      await record_bookings([booking(10, requested_capacity=30), booking(12)])
+      rollup = await collection_rollups.find_one({"room_name": "Sirius"})
+      assert rollup["booking_count"] == 3
+      assert rollup["peak_requested_capacity"] == 30
@@ -0,0 +1,74 @@
+import random
+from datetime import datetime, timedelta
+
+from app.utils.room_index import RoomIntervalIndex
+from app.utils.time_managment import combine_date_and_time
+from tests.test_reservations import ADMIN, DATE, add_users
+
+
+def at(hour: int) -> datetime:
+  return datetime(2030, 1, 1, hour)
+
+
+def test_overlaps_sees_a_long_booking_behind_a_short_one():
+  index = RoomIntervalIndex()
+  index.add("Sirius", at(8), at(18), "long")
+  index.add("Sirius", at(9), at(10), "short")
+
+  assert index.overlaps("Sirius", at(12), at(13))
+  assert index.overlaps("Sirius", at(17), at(19))
+  assert not index.overlaps("Sirius", at(18), at(19))
+  assert not index.overlaps("Sirius", at(6), at(8))
+  assert not index.overlaps("Proxima", at(12), at(13))
+
+  index.remove("Sirius", at(8), at(18))
+  assert not index.overlaps("Sirius", at(12), at(13))
+  assert index.overlaps("Sirius", at(9), at(11))
+
+
+async def test_conflicting_booking_is_rejected_until_cancelled(app, database):
+  def booking(start: str, end: str) -> dict:
+    return {"room_name": "Sirius", "start_time": start, "end_time": end, "date": DATE, "activity": "Lecture",
+            "group_name": "G1"}
+
+  async with app.test_app():
+    await add_users(database)
+    client = app.test_client()
+
+    assert (await client.post("/admin/book_room", headers=ADMIN, json=booking("08:00", "18:00"))).status_code == 200
+    assert (await client.post("/admin/book_room", headers=ADMIN, json=booking("12:00", "13:00"))).status_code == 409
+
+    response = await client.post("/admin/cancel_room", headers=ADMIN, json={
+      "room_name": "Sirius", "start": "08:00", "end": "18:00", "date": DATE})
+    assert response.status_code == 200
+
+    assert (await client.post("/admin/book_room", headers=ADMIN, json=booking("12:00", "13:00"))).status_code == 200
+
+
+def test_incremental_reach_matches_a_full_rebuild():
+  rng = random.Random(11)
+  index, stored = RoomIntervalIndex(), []
+  for step in range(400):
+    if stored and rng.random() < 0.4:
+      start, end = stored.pop(rng.randrange(len(stored)))
+      index.remove("Sirius", start, end)
+    else:
+      start = at(8) + timedelta(minutes=15 * rng.randrange(40))
+      end = start + timedelta(minutes=15 * rng.randrange(1, 12))
+      index.add("Sirius", start, end, step)
+      stored.append((start, end))
+    assert index.reach["Sirius"] == index.build_reach(index.rooms["Sirius"])
+
+
+async def test_a_booking_cancelled_elsewhere_does_not_block_the_slot(app, database):
+  async with app.test_app():
+    await add_users(database)
+    room_index = app.extensions["classroom"]["room_index"]
+    room_index.add("Sirius", *combine_date_and_time(DATE, "08:00", "18:00"), "cancelled-elsewhere")
+    assert room_index.overlaps("Sirius", *combine_date_and_time(DATE, "12:00", "13:00"))
+
+    response = await app.test_client().post("/admin/book_room", headers=ADMIN, json={
+      "room_name": "Sirius", "start_time": "12:00", "end_time": "13:00", "date": DATE, "activity": "Lecture",
+      "group_name": "G1"})
+    assert response.status_code == 200
+    assert all(interval[2] != "cancelled-elsewhere" for interval in room_index.rooms["Sirius"])
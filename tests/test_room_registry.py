@@ -0,0 +1,37 @@
+from app.models.schedule import RoomType
+from app.utils.room_registry import RoomRegistry, RoomInfo
+from tests.test_reservations import ADMIN, DATE, add_users
+
+
+def test_stale_resolve_outside_the_event_loop_serves_the_snapshot():
+  registry = RoomRegistry()
+  sirius = RoomInfo("SIRIUS", "Sirius", RoomType.MEETING_ROOMS, 6)
+  registry.rooms, registry.spellings, registry.loaded_at = (sirius,), {"Sirius": sirius}, 0.0
+
+  assert registry.is_stale()
+  assert registry.resolve("Sirius") is sirius
+  assert registry.reloading is None
+
+
+async def test_room_type_cannot_change_once_booked(app, database):
+  room = {"id": "SIRIUS", "name": "Sirius", "capacity": 6, "aliases": []}
+
+  async with app.test_app():
+    await add_users(database)
+    client = app.test_client()
+
+    response = await client.put("/admin/rooms", headers=ADMIN, json={**room, "room_type": "Classrooms"})
+    assert response.status_code == 200
+    response = await client.put("/admin/rooms", headers=ADMIN, json={**room, "room_type": "Meeting Rooms"})
+    assert response.status_code == 200
+
+    response = await client.post("/admin/book_room", headers=ADMIN, json={
+      "room_name": "Sirius", "start_time": "10:00", "end_time": "11:00", "date": DATE,
+      "activity": "Lecture", "group_name": "G1"})
+    assert response.status_code == 200
+
+    response = await client.put("/admin/rooms", headers=ADMIN, json={**room, "room_type": "Classrooms"})
+    assert response.status_code == 409
+    response = await client.put("/admin/rooms", headers=ADMIN, json={**room, "room_type": "Meeting Rooms",
+                                                                     "capacity": 8})
+    assert response.status_code == 200
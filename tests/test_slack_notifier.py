@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from aiohttp import test_utils, web
+
+from app.utils.send_to_admin import SlackNotifier, retry_after_seconds
+
+
+class StubSlack:
+  def __init__(self, responses):
+    self.responses = list(responses)
+    self.received = []
+    self.server = None
+    self.url = None
+
+  async def handle(self, request):
+    self.received.append(await request.json())
+    respond = self.responses.pop(0) if self.responses else ok
+    return await respond(request)
+
+  async def __aenter__(self):
+    app = web.Application()
+    app.router.add_post("/api/chat.postMessage", self.handle)
+    self.server = test_utils.TestServer(app, host="127.0.0.1")
+    await self.server.start_server()
+    self.url = str(self.server.make_url("/api/chat.postMessage"))
+    return self
+
+  async def __aexit__(self, *exc):
+    await self.server.close()
+
+
+async def ok(request):
+  return web.json_response({"ok": True})
+
+
+async def rate_limited_until_http_date(request):
+  retry_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+  return web.json_response({"ok": False}, status=429, headers={"Retry-After": format_datetime(retry_at, usegmt=True)})
+
+
+async def rate_limited_garbage(request):
+  return web.json_response({"ok": False}, status=429, headers={"Retry-After": "soon"})
+
+
+async def server_error(request):
+  return web.json_response({"ok": False}, status=500)
+
+
+async def too_slow(request):
+  await asyncio.sleep(1)
+  return web.json_response({"ok": True})
+
+
+async def not_an_object(request):
+  return web.json_response(["ok"])
+
+
+async def drain(notifier: SlackNotifier, *texts):
+  for text in texts:
+    assert notifier.enqueue(text)
+  await asyncio.wait_for(notifier.queue.join(), timeout=10)
+
+
+def test_retry_after_seconds():
+  assert retry_after_seconds("3", 1.0) == 3.0
+  assert retry_after_seconds("-2", 1.0) == 0.0
+  assert retry_after_seconds(None, 1.5) == 1.5
+  assert retry_after_seconds("soon", 1.5) == 1.5
+  assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT", 1.5) == 0.0
+
+  retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+  assert 25 < retry_after_seconds(format_datetime(retry_at, usegmt=True), 1.0) <= 30
+
+
+async def test_retries_server_errors_and_rate_limits():
+  async with StubSlack([server_error, rate_limited_garbage, rate_limited_until_http_date, ok]) as stub:
+    notifier = SlackNotifier(token="test", url=stub.url, max_retries=5, retry_delay=0.01)
+    await notifier.start()
+    try:
+      await drain(notifier, "room booked")
+    finally:
+      await notifier.stop()
+
+  assert len(stub.received) == 4
+  assert stub.received[-1]["text"] == "room booked"
+  assert notifier.stats()["sent"] == 1
+  assert notifier.stats()["failed"] == 0
+  assert notifier.stats()["retries"] == 3
+
+
+async def test_worker_survives_timeouts_and_unexpected_errors():
+  async with StubSlack([too_slow, too_slow, not_an_object, ok]) as stub:
+    notifier = SlackNotifier(token="test", url=stub.url, max_retries=2, retry_delay=0.01, timeout=0.2)
+    await notifier.start()
+    try:
+      await drain(notifier, "first")
+      await drain(notifier, "second")
+      await drain(notifier, "third")
+      assert not notifier.worker.done()
+    finally:
+      await notifier.stop()
+
+  stats = notifier.stats()
+  assert stats["failed"] == 2
+  assert stats["sent"] == 1
+  assert stub.received[-1]["text"] == "third"
+
+
+async def test_batches_queued_messages():
+  async with StubSlack([]) as stub:
+    notifier = SlackNotifier(token="test", url=stub.url, batch_size=10)
+    for text in ("one", "two", "three"):
+      notifier.enqueue(text)
+    await notifier.start()
+    try:
+      await asyncio.wait_for(notifier.queue.join(), timeout=10)
+    finally:
+      await notifier.stop()
+
+  assert [message["text"] for message in stub.received] == ["one\n\ntwo\n\nthree"]
+  assert notifier.stats()["sent"] == 3
@@ -0,0 +1,49 @@
+import asyncio
+from unittest import mock
+
+from bson import ObjectId
+
+from app.utils.student_search import StudentSearchIndex
+
+
+def student(name: str, surname: str) -> dict:
+  return {"_id": ObjectId(), "name": name, "surname": surname, "role": "student",
+          "email": f"{name}.{surname}@test.local".lower()}
+
+
+async def test_changes_during_reload_survive_the_swap(app, database):
+  kept, removed, added = student("Ada", "Lovelace"), student("Alan", "Turing"), student("Grace", "Hopper")
+  await database.users.insert_many([kept, removed])
+
+  async with app.app_context():
+    index = StudentSearchIndex()
+    await index.load()
+    await reload_while_changing(index, database, added, removed)
+
+  assert [row["name"] for row in index.search("grace", 10)] == ["Grace"]
+  assert index.search("turing", 10) == []
+  assert [row["name"] for row in index.search("lovelace", 10)] == ["Ada"]
+
+
+async def reload_while_changing(index: StudentSearchIndex, database, added: dict, removed: dict):
+  reading, resume = asyncio.Event(), asyncio.Event()
+  find = type(database.users).find
+
+  def paused_find(collection, *args, **kwargs):
+    cursor = find(collection, *args, **kwargs)
+
+    async def rows():
+      async for row in cursor:
+        reading.set()
+        await resume.wait()
+        yield row
+
+    return rows()
+
+  with mock.patch.object(type(database.users), "find", paused_find):
+    reload = asyncio.create_task(index.load())
+    await reading.wait()
+    index.add(added)
+    index.remove(removed["_id"])
+    resume.set()
+    await reload
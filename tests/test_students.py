@@ -0,0 +1,59 @@
+import json
+from unittest import mock
+
+from tests.test_reservations import ADMIN, add_users
+
+
+async def test_student_lookup_requires_a_filter_on_every_path(app, database):
+  async with app.test_app():
+    await add_users(database)
+    client = app.test_client()
+
+    for path in ("/admin/get_student", "/admin/get_student?limit=10"):
+      response = await client.post(path, headers=ADMIN, json={"group_name": "G1"})
+      assert response.status_code == 400
+
+      response = await client.post(path, headers=ADMIN, json={"name": "Test"})
+      assert response.status_code == 200
+      body = await response.get_json()
+      students = body["students"] if "students" in body else body
+      assert [student["surname"] for student in students] == ["Student"]
+
+
+async def test_student_stream_reads_every_row(app, database):
+  async with app.test_app():
+    await add_users(database)
+    await database.users.insert_many([{"name": f"Student{i}", "surname": "Bulk", "role": "student",
+                                       "api_key": f"bulk-{i}"} for i in range(25)])
+    client = app.test_client()
+
+    response = await client.get("/admin/students?format=ndjson", headers=ADMIN)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in (await response.get_data(as_text=True)).splitlines()]
+
+  assert len(rows) == 26
+  assert all("api_key" not in row for row in rows)
+  assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+
+
+async def test_malformed_csv_row_after_an_inserted_batch_is_reported(app, database):
+  rows = ["name,surname,email,phone_number,group_name"]
+  rows += [f"Student,Bulk,bulk{i}@example.com,+3100000000{i:02d},G1" for i in range(3)]
+  rows.append("Broken,Row,broken@example.com,+310000000099,G1,surplus")
+
+  async with app.test_app():
+    await add_users(database)
+    client = app.test_client()
+
+    with mock.patch("app.services.admin_service.BULK_BATCH_SIZE", 2):
+      response = await client.post("/admin/students/bulk", headers={**ADMIN, "Content-Type": "text/csv"},
+                                   data="\n".join(rows))
+    assert response.status_code == 200
+    body = await response.get_json()
+
+    assert body["created"] == 3 and body["failed"] == 1
+    assert all(result["api_key"] for result in body["results"][:3])
+    assert body["results"][3]["status"] == "error"
+    assert await database.users.count_documents({"surname": "Bulk"}) == 3
+    assert not await database.users.find_one({"email": "broken@example.com"})